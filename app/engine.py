@@ -1,5 +1,10 @@
+import collections
 import datetime
+import functools
 import math
+import threading
+
+import numpy as np
 
 # ====================== DATA CONSTANTS ======================
 # Standard "Life Spread" (Year 0)
@@ -29,16 +34,42 @@ P = [
 ROWS = ['Mercury','Venus','Mars','Jupiter','Saturn','Uranus','Neptune']
 NO_DISP_ENV = {'K♠', 'J♥', '8♣', 'A♣', '2♥', '7♦', '9♥'}
 
+# ====================== CARD ENCODING ======================
+# Inside the engine a card is an id 0-51 (Solar Value - 1): id 0 = A♥ ... id 51 = K♠.
+# Spreads are bytes of ids; strings are only produced at the API boundary.
+SUITS = ('♥','♣','♦','♠')
+RANKS = ('A','2','3','4','5','6','7','8','9','10','J','Q','K')
+REALMS = ('Emotional','Behavioral','Material','Intellectual')  # Indexed like SUITS
+ARCHETYPES = ('Pioneer','Partner','Creator','Builder','Disruptor','Server','Seeker',
+              'Commander','Completer','Master','Messenger','Sovereign','Authority')  # Indexed like RANKS
+
+CARD_NAMES = tuple(f"{RANKS[cid % 13]}{SUITS[cid // 13]}" for cid in range(52))
+CARD_IDS = {name: cid for cid, name in enumerate(CARD_NAMES)}
+CARD_SUIT = tuple(SUITS[cid // 13] for cid in range(52))
+CARD_RANK = tuple(RANKS[cid % 13] for cid in range(52))
+CARD_REALM = tuple(REALMS[cid // 13] for cid in range(52))
+CARD_ARCHETYPE = tuple(ARCHETYPES[cid % 13] for cid in range(52))
+
+YEAR_0_IDS = bytes(CARD_IDS[card] for card in YEAR_0)
+NO_DISP_ENV_MASK = tuple(name in NO_DISP_ENV for name in CARD_NAMES)
+
 # ====================== CORE LOGIC ======================
 
 def get_birth_card(month: int, day: int):
     """Calculates birth card from month/day using Solar Value."""
     sv = 55 - (month * 2 + day)
     if sv <= 0: return "Joker", 0
-    suits = ['♥','♣','♦','♠']
-    ranks = ['A','2','3','4','5','6','7','8','9','10','J','Q','K']
     # sv 1 = A♥, sv 52 = K♠
-    return f"{ranks[(sv-1)%13]}{suits[(sv-1)//13]}", sv
+    return CARD_NAMES[sv - 1], sv
+
+def card_name(cid):
+    """Engine card id -> display string (None passes through)."""
+    return CARD_NAMES[cid] if cid is not None else None
+
+def get_birth_card_id(month: int, day: int):
+    """Birth card as an engine card id, or None for the Joker (Dec 31)."""
+    sv = 55 - (month * 2 + day)
+    return sv - 1 if sv > 0 else None
 
 def get_spread_year(birth_month: int, birth_day: int, birth_year: int, target_date: datetime.date):
     """Calculates the Spread Year (Age + 1) and day of year."""
@@ -58,185 +89,237 @@ def get_spread_year(birth_month: int, birth_day: int, birth_year: int, target_da
     spread_year = min(max(age + 1, 1), 90)
     return age, days_since, spread_year, last_bday
 
-def generate_yearly_spread_data(spread_year: int):
-    """Generates the grid and crown for a specific spread year."""
-    # Start with Year 0
-    flat = YEAR_0[:]
-    
-    # Shuffle N times
+def _cycle_decomposition(perm):
+    """Splits a permutation into its disjoint cycles (each as a list of indices)."""
+    seen = [False] * len(perm)
+    cycles = []
+    for i in range(len(perm)):
+        if seen[i]:
+            continue
+        cycle = []
+        j = i
+        while not seen[j]:
+            seen[j] = True
+            cycle.append(j)
+            j = perm[j]
+        cycles.append(cycle)
+    return cycles
+
+P_CYCLES = _cycle_decomposition(P)
+# Number of shuffles after which the deck returns to the Life Spread.
+P_ORDER = 1
+for _cycle in P_CYCLES:
+    P_ORDER = P_ORDER * len(_cycle) // math.gcd(P_ORDER, len(_cycle))
+
+def _permutation_power(k: int):
+    """Returns P^k as an index list in O(52): shuffling k times maps slot i to YEAR_0[P^k[i]]."""
+    power = [0] * len(P)
+    for cycle in P_CYCLES:
+        n = len(cycle)
+        for pos, i in enumerate(cycle):
+            power[i] = cycle[(pos + k) % n]
+    return power
+
+def _spread_ids(spread_year: int):
+    """Card ids by slot (0-48 grid row-major, 49-51 crown) for a spread year, from P^spread_year."""
     # Note: spread_year 0 = Life Spread. spread_year 1 = First shuffle.
-    # The spec implies `data[str(spread_year)]` where 0 is base.
-    # If spread_year is 1 (Age 0), is it Year 0 or Year 1?
-    # Spec: "Spread Year = age + 1". So Age 0 = Spread Year 1.
-    # Usually Age 0 lives in the Life Spread (Year 0). 
-    # But let's follow the logic: "Extract exactly spread_year cards".
-    # If spread_year = 1, we extract 1 card.
-    # The spread we LOOK AT depends on the system.
-    # Spec says: "yearly = data[str(spread_year)]". 
-    # This implies there IS a spread for Year 36.
-    # I will assume we shuffle `spread_year` times from Year 0.
-    
-    for _ in range(spread_year):
-        flat = [flat[i] for i in P]
-        
+    # Spec: "Spread Year = age + 1", so Age 0 = Spread Year 1 (one shuffle).
+    return bytes(YEAR_0_IDS[i] for i in _permutation_power(spread_year))
+
+def _slots_of(flat_ids):
+    """Inverse of a spread: slot by card id."""
+    slots = bytearray(len(flat_ids))
+    for slot, cid in enumerate(flat_ids):
+        slots[cid] = slot
+    return bytes(slots)
+
+def _build_spread(spread_year: int, flat_ids=None):
+    """Builds the string (grid, crown) pair for a spread year."""
+    if flat_ids is None:
+        flat_ids = _spread_ids(spread_year)
+    flat = [CARD_NAMES[cid] for cid in flat_ids]
+
     # Map to Grid and Crown
-    # Grid: 7 rows of 7 (indices 0-48)
+    # Grid: 7 rows of 7 (indices 0-48). grid[row_name][col_index] keeps the flat order:
+    # Col 0 = Mercury (Right), Col 6 = Neptune (Left), matching extract_chain's
+    # right-to-left, top-to-bottom scan.
+    # Rows are tuples because every caller shares the same precomputed spread.
     grid = {}
     for r_idx, row_name in enumerate(ROWS):
         start = r_idx * 7
-        end = start + 7
-        # Python lists are left-to-right, but spec says Col 0 is Neptune (Left) -> Col 6 Mercury (Right)?
-        # Spec: "Cols (left→right, index 0→6): Neptune...Mercury"
-        # YEAR_0 list: Index 0 is 7♥ (Mercury/Mercury). 
-        # Usually Merc/Merc is Top Right.
-        # If Col 6 is Mercury (Right), then Index 0 should be at Col 6?
-        # Let's look at `extract_chain`:
-        # "In grid, col == 0 (Left), row < 6: row += 1, col = 6 (Right)"
-        # This scans rows Right-to-Left (6->0), Top-to-Bottom.
-        # So Index 0 should be at Col 6 (Right).
-        # Index 1 at Col 5... Index 6 at Col 0.
-        row_cards = flat[start:end]
-        # Reverse the row to map indices 0..6 to Cols 6..0? 
-        # Or does grid[row][0] mean Col 0?
-        # Spec: "grid[row_name][col_index]"
-        # If I want Index 0 to be Col 6:
-        # grid[row][6] = flat[start]
-        # grid[row][0] = flat[end-1]
-        # Let's construct it so grid[row_name] is a list where index = col.
-        # So we need to REVERSE the slice from flat if flat is sorted Right-to-Left.
-        # YEAR_0: 7♥ is Merc/Merc.
-        # If Merc/Merc is Col 6, then flat[0] -> Col 6.
-        # flat[6] -> Col 0.
-        # So grid row list should be flat[start:end] REVERSED.
-        # UPDATE: Reversed logic was incorrect for index mapping. 
-        # Col 0 = Mercury (Right), Col 6 = Neptune (Left).
-        grid[row_name] = row_cards
-
-    # Crown: Indices 49-51.
-    # Spec: "crown = [Saturn_card(0), Jupiter_card(1), Mars_card(2)]"
-    # YEAR_0: K♠(49), Q♠(50), J♠(51).
-    # Usually K♠ is Saturn(0)? Q♠ Jupiter? J♠ Mars?
-    # Let's assume order is preserved: crown[0] = flat[49].
-    crown = flat[49:52]
-    
+        grid[row_name] = tuple(flat[start:start + 7])
+
+    # Crown: Indices 49-51, order preserved (crown[0] = flat[49]).
+    crown = tuple(flat[49:52])
+
     return grid, crown
 
-def extract_chain(grid, crown, birth_card, spread_year):
-    """Extracts the planetary period chain."""
-    r = c = None
-    in_crown_anchor = False
-    anchor_cidx = None
+# Row index used in card positions for the three crown slots.
+CROWN_ROW = len(ROWS)
 
-    # Find Anchor
+def index_spread(grid, crown):
+    """Builds the inverse index card -> (row_idx, col_idx); crown cards use CROWN_ROW and their crown slot."""
+    index = {}
     for ri, rn in enumerate(ROWS):
-        if birth_card in grid[rn]:
-            r = ri
-            c = grid[rn].index(birth_card)
-            break
-            
-    if r is None:
-        if birth_card in crown:
-            in_crown_anchor = True
-            anchor_cidx = crown.index(birth_card)
-
-    results = []
-    in_crown = in_crown_anchor
-    
-    # State variables for traversal
-    curr_r, curr_c = r, c
-    curr_cidx = anchor_cidx
+        for ci, card in enumerate(grid[rn]):
+            index[card] = (ri, ci)
+    for cidx, card in enumerate(crown):
+        index[card] = (CROWN_ROW, cidx)
+    return index
 
-    # Logic from spec
-    # "Starting immediately left of the anchor"
-    # We simulate steps.
-    
-    # Helper to move one step left
-    def move_step(loc_in_crown, loc_r, loc_c, loc_cidx):
-        if loc_in_crown:
-            if loc_cidx > 0:
-                return True, None, None, loc_cidx - 1 # Stay in crown, move left
-            else:
-                return False, 0, 6, None # Exit crown to Merc(0) Col 6
-        else:
-            if loc_c > 0:
-                return False, loc_r, loc_c - 1, None # Grid move left
-            elif loc_r < 6:
-                return False, loc_r + 1, 6, None # Grid drop row, reset to right
-            else:
-                return True, None, None, 2 # Enter crown at index 2 (Mars)
-
-    # Initial move (Start immediately left)
-    in_crown, curr_r, curr_c, curr_cidx = move_step(in_crown, curr_r, curr_c, curr_cidx)
-
-    while len(results) < spread_year:
-        # Collect card at current position
-        if in_crown:
-            results.append(crown[curr_cidx])
-        else:
-            results.append(grid[ROWS[curr_r]][curr_c])
-            
-        # Move to next for next iteration? 
-        # Wait, loop condition is len < spread_year.
-        # We collect, THEN move? Or Move THEN collect?
-        # Spec: "Starting immediately left... collect cards... extract spread_year cards total"
-        # So we collect the one we just moved to.
-        # Then we need to move AGAIN for the next one?
-        # Yes.
-        if len(results) < spread_year:
-             in_crown, curr_r, curr_c, curr_cidx = move_step(in_crown, curr_r, curr_c, curr_cidx)
-
-    return results
-
-def get_displacement_environment(life_grid, life_crown, yearly_grid, yearly_crown, birth_card):
+def card_at(grid, crown, position):
+    """Returns the card sitting at a (row_idx, col_idx) position."""
+    ri, ci = position
+    if ri == CROWN_ROW:
+        return crown[ci]
+    return grid[ROWS[ri]][ci]
+
+MAX_SPREAD_YEAR = 90
+
+# Every spread the engine can hand out (Life Spread + years 1-90), built once at import:
+# as id bytes with their slot-by-id inverse, and as string grids with their card -> position index.
+SPREAD_IDS = tuple(_spread_ids(y) for y in range(MAX_SPREAD_YEAR + 1))
+SPREAD_SLOTS = tuple(_slots_of(flat_ids) for flat_ids in SPREAD_IDS)
+SPREADS = tuple(_build_spread(y, flat_ids) for y, flat_ids in enumerate(SPREAD_IDS))
+SPREAD_INDEXES = tuple(index_spread(grid, crown) for grid, crown in SPREADS)
+
+def spread_for_year(k: int):
+    """Returns the (grid, crown) for any number of shuffles k, reading the precomputed table when possible."""
+    if 0 <= k <= MAX_SPREAD_YEAR:
+        return SPREADS[k]
+    k %= P_ORDER
+    if k <= MAX_SPREAD_YEAR:
+        return SPREADS[k]
+    return _build_spread(k)
+
+def spread_ids_for_year(k: int):
+    """Returns (card ids by slot, slot by card id) for the spread after k shuffles."""
+    if 0 <= k <= MAX_SPREAD_YEAR:
+        return SPREAD_IDS[k], SPREAD_SLOTS[k]
+    k %= P_ORDER
+    if k <= MAX_SPREAD_YEAR:
+        return SPREAD_IDS[k], SPREAD_SLOTS[k]
+    flat_ids = _spread_ids(k)
+    return flat_ids, _slots_of(flat_ids)
+
+def generate_yearly_spread_data(spread_year: int):
+    """Generates the grid and crown for a specific spread year."""
+    return spread_for_year(spread_year)
+
+def spread_index_for_year(k: int):
+    """Returns the card -> position index for the spread after k shuffles."""
+    if 0 <= k <= MAX_SPREAD_YEAR:
+        return SPREAD_INDEXES[k]
+    k %= P_ORDER
+    if k <= MAX_SPREAD_YEAR:
+        return SPREAD_INDEXES[k]
+    return index_spread(*_build_spread(k))
+
+def locate(card, spread_year: int):
+    """Finds a card's (row_idx, col_idx) in a spread year in O(1); None if the card is not in the deck."""
+    return spread_index_for_year(spread_year).get(card)
+
+def _step_left(slot: int):
+    """One chain step from a slot: right-to-left, top-to-bottom, then crown 2->0, wrapping to Mercury."""
+    if slot >= 49:
+        return slot - 1 if slot > 49 else 6  # Crown moves left, then exits to Merc(0) Col 6
+    r, c = divmod(slot, 7)
+    if c > 0:
+        return slot - 1  # Grid move left
+    if r < 6:
+        return (r + 1) * 7 + 6  # Grid drop row, reset to right
+    return 51  # Enter crown at index 2 (Mars)
+
+def _traversal_order():
+    """Every slot in chain order, starting at Merc(0) Col 6 and walking the whole spread once."""
+    order = [6]
+    while len(order) < 52:
+        order.append(_step_left(order[-1]))
+    return tuple(order)
+
+# The chain walk is fixed, so any chain is a rotation of this slot sequence.
+TRAVERSAL_ORDER = _traversal_order()
+TRAVERSAL_POS = bytes(TRAVERSAL_ORDER.index(slot) for slot in range(52))  # Position in the order by slot
+
+def _take_cyclic(cycle, count: int):
+    """First `count` items of a 52-item cycle, wrapping around as many times as needed."""
+    if count <= 52:
+        return cycle[:count]
+    laps, rest = divmod(count, 52)
+    return cycle * laps + cycle[:rest]
+
+def _rotated_chain(ordered, anchor_slot: int, count: int):
+    """`count` items of a traversal-ordered sequence, starting just after the anchor slot."""
+    start = TRAVERSAL_POS[anchor_slot] + 1
+    return _take_cyclic(ordered[start:] + ordered[:start], count)
+
+@functools.lru_cache(maxsize=None)
+def _full_chain_ids(shuffles: int, birth_id: int):
+    flat_ids, slots = spread_ids_for_year(shuffles)
+    ordered = bytes(flat_ids[slot] for slot in TRAVERSAL_ORDER)
+    return _rotated_chain(ordered, slots[birth_id], 52)
+
+def full_chain_ids(spread_year: int, birth_id: int):
+    """The 52-card cyclic chain of card ids for a birth card in a spread year (cached)."""
+    return _full_chain_ids(spread_year % P_ORDER, birth_id)
+
+@functools.lru_cache(maxsize=None)
+def _full_chain(shuffles: int, birth_card: str):
+    return tuple(CARD_NAMES[cid] for cid in full_chain_ids(shuffles, CARD_IDS[birth_card]))
+
+def full_chain(spread_year: int, birth_card: str):
+    """The 52-card cyclic chain for a birth card in a spread year, as card strings (cached)."""
+    return _full_chain(spread_year % P_ORDER, birth_card)
+
+def extract_chain_ids(spread_year: int, birth_id: int, count: int):
+    """Chain of `count` card ids starting immediately left of the birth card in a spread year."""
+    return _take_cyclic(full_chain_ids(spread_year, birth_id), count)
+
+def extract_chain(grid, crown, birth_card, spread_year, index=None):
+    """Extracts the planetary period chain.
+
+    Starting immediately left of the anchor, collects `spread_year` cards as a
+    rotation of TRAVERSAL_ORDER. `index` is the spread's card -> position index
+    (see SPREAD_INDEXES); it is built on the fly when the spread did not come
+    from the precomputed table.
+    """
+    if index is None:
+        index = index_spread(grid, crown)
+    anchor = index.get(birth_card)
+    if anchor is None:
+        raise ValueError(f"{birth_card!r} is not in the spread.")
+
+    flat = [card for rn in ROWS for card in grid[rn]]
+    flat.extend(crown)
+    ordered = [flat[slot] for slot in TRAVERSAL_ORDER]
+    ri, ci = anchor
+    return _rotated_chain(ordered, ri * 7 + ci, spread_year)
+
+def get_displacement_environment(life_grid, life_crown, yearly_grid, yearly_crown, birth_card,
+                                 life_index=None, yearly_index=None):
     # Displacement: Year 0 card at birth card's current position
-    disp = None
-    env = None
-    
-    # Find current position of birth card
-    curr_r = curr_c = curr_cidx = None
-    is_crown = False
-    
-    for ri, rn in enumerate(ROWS):
-        if birth_card in yearly_grid[rn]:
-            curr_r = ri
-            curr_c = yearly_grid[rn].index(birth_card)
-            break
-    if curr_r is None:
-        if birth_card in yearly_crown:
-            is_crown = True
-            curr_cidx = yearly_crown.index(birth_card)
-            
-    if is_crown:
-        disp = life_crown[curr_cidx]
-    elif curr_r is not None:
-        disp = life_grid[ROWS[curr_r]][curr_c]
-        
     # Environment: Yearly card at birth card's Year 0 position
-    # Find Year 0 position
-    y0_r = y0_c = y0_cidx = None
-    y0_is_crown = False
-    
-    for ri, rn in enumerate(ROWS):
-        if birth_card in life_grid[rn]:
-            y0_r = ri
-            y0_c = life_grid[rn].index(birth_card)
-            break
-    if y0_r is None:
-        if birth_card in life_crown:
-            y0_is_crown = True
-            y0_cidx = life_crown.index(birth_card)
-            
-    if y0_is_crown:
-        env = yearly_crown[y0_cidx]
-    elif y0_r is not None:
-        env = yearly_grid[ROWS[y0_r]][y0_c]
-        
+    if life_index is None:
+        life_index = index_spread(life_grid, life_crown)
+    if yearly_index is None:
+        yearly_index = index_spread(yearly_grid, yearly_crown)
+
+    disp = env = None
+    curr_pos = yearly_index.get(birth_card)
+    if curr_pos is not None:
+        disp = card_at(life_grid, life_crown, curr_pos)
+    y0_pos = life_index.get(birth_card)
+    if y0_pos is not None:
+        env = card_at(yearly_grid, yearly_crown, y0_pos)
+
     return disp, env
 
 # ====================== INTERPRETATION HELPERS ======================
 
 def get_suit_realm(card: str):
     if not card: return "Unknown"
+    cid = CARD_IDS.get(card)
+    if cid is not None: return CARD_REALM[cid]
     if '♥' in card: return "Emotional"
     if '♣' in card: return "Behavioral"
     if '♦' in card: return "Material"
@@ -244,6 +327,8 @@ def get_suit_realm(card: str):
 
 def get_rank_archetype(card: str):
     if not card: return "Unknown"
+    cid = CARD_IDS.get(card)
+    if cid is not None: return CARD_ARCHETYPE[cid]
     r = card.replace('♥','').replace('♣','').replace('♦','').replace('♠','')
     arch = {
         'A':'Pioneer','2':'Partner','3':'Creator','4':'Builder','5':'Disruptor',
@@ -252,62 +337,308 @@ def get_rank_archetype(card: str):
     }
     return arch.get(r, r)
 
+# ====================== READING CACHE ======================
+
+def compute_reading(birth_id: int, spread_year: int, period_idx: int):
+    """Card names (period, long_range, pluto, result, displacement, environment) for a reading.
+
+    Raises IndexError when the period falls beyond the spread_year cards extracted.
+    """
+    # Load Spreads (Life and Current)
+    life_ids, life_slots = spread_ids_for_year(0)
+    yearly_ids, yearly_slots = spread_ids_for_year(spread_year)
+
+    # Extract Chain
+    chain = extract_chain_ids(spread_year, birth_id, spread_year)
+
+    # Active period
+    period_card = chain[period_idx]
+
+    # Year Long
+    long_range = chain[spread_year - 1] # Last card extracted
+    pluto = chain[7] if spread_year >= 8 else None
+    result = chain[8] if spread_year >= 9 else None
+
+    # Disp/Env
+    # Displacement: Year 0 card at birth card's current position
+    # Environment: Yearly card at birth card's Year 0 position
+    disp = env = None
+    if not NO_DISP_ENV_MASK[birth_id]:
+        disp = life_ids[yearly_slots[birth_id]]
+        env = yearly_ids[life_slots[birth_id]]
+
+    return tuple(card_name(cid) for cid in (period_card, long_range, pluto, result, disp, env))
+
+class ReadingCache:
+    """Bounded LRU of readings keyed on (birth card id, spread year, period index).
+
+    There are at most 52 x 90 x 7 distinct readings; `materialize()` fills them all.
+    """
+
+    def __init__(self, maxsize: int = 52 * MAX_SPREAD_YEAR * 7):
+        self.maxsize = maxsize
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, birth_id: int, spread_year: int, period_idx: int):
+        key = (birth_id, spread_year, period_idx)
+        with self._lock:
+            reading = self._entries.get(key)
+            if reading is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return reading
+            self.misses += 1
+
+        reading = compute_reading(birth_id, spread_year, period_idx)
+        with self._lock:
+            self._store(key, reading)
+        return reading
+
+    def _store(self, key, reading):
+        self._entries[key] = reading
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def materialize(self):
+        """Computes every reading up front (periods past a young spread's chain are skipped)."""
+        with self._lock:
+            for spread_year in range(1, MAX_SPREAD_YEAR + 1):
+                for birth_id in range(52):
+                    for period_idx in range(min(spread_year, 7)):
+                        key = (birth_id, spread_year, period_idx)
+                        if key not in self._entries:
+                            self._store(key, compute_reading(birth_id, spread_year, period_idx))
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+READING_CACHE = ReadingCache()
+
+# ====================== RESULT TYPE ======================
+
+class LetterData:
+    """Result of calculate_letter_data.
+
+    The period card is resolved up front; the year-long cards (long_range, pluto,
+    result, displacement, environment) are read from READING_CACHE on first
+    access. Supports the old dict-style reads (data['period']['card'],
+    data.get('birth_card')) and `to_dict()` for JSON consumers.
+    """
+
+    __slots__ = ("subscriber", "birth_id", "age", "spread_year", "period_idx", "days_since",
+                 "period_card", "_year_long")
+
+    _KEYS = ("subscriber", "birth_card", "age", "spread_year", "period", "year_long")
+
+    def __init__(self, subscriber, birth_id: int, age: int, spread_year: int, period_idx: int, days_since: int):
+        if period_idx >= spread_year:
+            raise IndexError(f"{ROWS[period_idx]} period falls beyond the {spread_year}-card chain.")
+        self.subscriber = subscriber
+        self.birth_id = birth_id
+        self.age = age
+        self.spread_year = spread_year
+        self.period_idx = period_idx
+        self.days_since = days_since
+        self.period_card = CARD_NAMES[full_chain_ids(spread_year, birth_id)[period_idx]]
+        self._year_long = None
+
+    @property
+    def birth_card(self):
+        return CARD_NAMES[self.birth_id]
+
+    @property
+    def planet(self):
+        return ROWS[self.period_idx]
+
+    def _year_long_cards(self):
+        if self._year_long is None:
+            # (period, long_range, pluto, result, displacement, environment)
+            self._year_long = READING_CACHE.get(self.birth_id, self.spread_year, self.period_idx)[1:]
+        return self._year_long
+
+    @property
+    def long_range(self):
+        return self._year_long_cards()[0]
+
+    @property
+    def pluto(self):
+        return self._year_long_cards()[1]
+
+    @property
+    def result(self):
+        return self._year_long_cards()[2]
+
+    @property
+    def displacement(self):
+        return self._year_long_cards()[3]
+
+    @property
+    def environment(self):
+        return self._year_long_cards()[4]
+
+    @property
+    def period(self):
+        return {"card": self.period_card, "planet": self.planet, "days_since": self.days_since}
+
+    @property
+    def year_long(self):
+        long_range, pluto, result, disp, env = self._year_long_cards()
+        return {
+            "long_range": long_range,
+            "pluto": pluto,
+            "result": result,
+            "displacement": disp,
+            "environment": env
+        }
+
+    def __getitem__(self, key):
+        if key not in self._KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in self._KEYS
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self._KEYS else default
+
+    def to_dict(self):
+        return {key: getattr(self, key) for key in self._KEYS}
+
+    def __repr__(self):
+        return f"LetterData({self.to_dict()!r})"
+
 # ====================== API ENTRY POINT ======================
 
 def calculate_letter_data(first_name, birth_year, birth_month, birth_day, target_date_str="2026-03-15"):
     target_date = datetime.datetime.strptime(target_date_str, "%Y-%m-%d").date()
     
     # 1. Birth Card
-    bc, sv = get_birth_card(birth_month, birth_day)
-    if bc == "Joker":
+    bid = get_birth_card_id(birth_month, birth_day)
+    if bid is None:
         return {"error": "Joker cannot receive a spread."}
         
     # 2. Spread Year
     age, days_since, spread_year, last_bday = get_spread_year(birth_month, birth_day, birth_year, target_date)
     
-    # 3. Load Spreads (Life and Current)
-    life_grid, life_crown = generate_yearly_spread_data(0)
-    yearly_grid, yearly_crown = generate_yearly_spread_data(spread_year)
-    
-    # 4. Extract Chain
-    chain = extract_chain(yearly_grid, yearly_crown, bc, spread_year)
-    
-    # 5. Assign Cards
-    # Active period
+    # 3. Period
     # Days 1-52: Mercury (idx 0), 53-104: Venus (idx 1)...
-    # Use days_since to find index
     period_idx = min((days_since - 1) // 52, 6)
-    period_card = chain[period_idx]
-    planet = ROWS[period_idx]
-    
-    # Year Long
-    long_range = chain[spread_year - 1] # Last card extracted
-    pluto = chain[7] if spread_year >= 8 else None
-    result = chain[8] if spread_year >= 9 else None
-    
-    # Disp/Env
-    disp, env = get_displacement_environment(life_grid, life_crown, yearly_grid, yearly_crown, bc)
-    if bc in NO_DISP_ENV:
-        disp = env = None
-        
-    return {
-        "subscriber": first_name,
-        "birth_card": bc,
+
+    # 4. Cards are resolved on access (see LetterData)
+    return LetterData(first_name, bid, age, spread_year, period_idx, days_since)
+
+# ====================== BATCH API ======================
+
+@functools.lru_cache(maxsize=None)
+def _batch_tables():
+    """NumPy views of the precomputed tables used by calculate_letter_data_many."""
+    chains = np.array([[list(full_chain_ids(y, bid)) for bid in range(52)]
+                       for y in range(MAX_SPREAD_YEAR + 1)], dtype=np.int16)
+    spread_ids = np.array([list(flat_ids) for flat_ids in SPREAD_IDS], dtype=np.int16)
+    spread_slots = np.array([list(slots) for slots in SPREAD_SLOTS], dtype=np.int16)
+    no_disp_env = np.array(NO_DISP_ENV_MASK, dtype=bool)
+    return chains, spread_ids, spread_slots, no_disp_env
+
+# Decoding arrays for names=True; index -1 (no card) lands on the trailing None.
+_CARD_NAME_ARRAY = np.array(CARD_NAMES + (None,), dtype=object)
+_ROW_NAME_ARRAY = np.array(ROWS, dtype=object)
+
+def _birthdays_in(years, months, days):
+    """datetime64[D] birthdays in the given years, with get_spread_year's Mar 1 fallback for invalid dates."""
+    month_start = ((years - 1970) * 12 + (months - 1)).astype('datetime64[M]')
+    month_len = ((month_start + 1).astype('datetime64[D]') - month_start.astype('datetime64[D]')).astype(np.int64)
+    bday = month_start.astype('datetime64[D]') + (days - 1)
+    mar_1 = ((years - 1970) * 12 + 2).astype('datetime64[M]').astype('datetime64[D]')
+    return np.where(days <= month_len, bday, mar_1)
+
+def calculate_letter_data_many(birth_years, birth_months, birth_days, target_dates="2026-03-15", names=False):
+    """Vectorized calculate_letter_data over arrays of birth dates and target dates.
+
+    Inputs broadcast against each other; target dates may be 'YYYY-MM-DD' strings,
+    dates or datetime64. Returns a columnar dict of NumPy arrays. Card columns hold
+    engine card ids with -1 for "no card" (or card strings / None with names=True).
+    `valid` is False for Joker birthdays and for rows whose period falls beyond the
+    extracted chain, where the scalar API returns an error or raises.
+    """
+    by, bm, bd, target = np.broadcast_arrays(
+        np.asarray(birth_years, dtype=np.int64),
+        np.asarray(birth_months, dtype=np.int64),
+        np.asarray(birth_days, dtype=np.int64),
+        np.asarray(target_dates, dtype='datetime64[D]'),
+    )
+    chains, spread_ids, spread_slots, no_disp_env = _batch_tables()
+
+    # 1. Birth Card
+    sv = 55 - (bm * 2 + bd)
+    joker = sv <= 0
+    bid = np.where(joker, 0, sv - 1)
+
+    # 2. Spread Year
+    ty = target.astype('datetime64[Y]').astype(np.int64) + 1970
+    last_bday = _birthdays_in(ty, bm, bd)
+    before = last_bday > target
+    last_bday = np.where(before, _birthdays_in(ty - 1, bm, bd), last_bday)
+    age = np.where(before, ty - 1, ty) - by
+    days_since = (target - last_bday).astype(np.int64) + 1
+    spread_year = np.clip(age + 1, 1, MAX_SPREAD_YEAR)
+
+    # 3. Chain positions (chains are 52-card cycles, so longer chains wrap)
+    period_idx = np.minimum((days_since - 1) // 52, 6)
+    chain = chains[spread_year, bid]
+    period_card = np.take_along_axis(chain, (period_idx % 52)[..., None], axis=-1)[..., 0]
+    long_range = np.take_along_axis(chain, ((spread_year - 1) % 52)[..., None], axis=-1)[..., 0]
+    pluto = np.where(spread_year >= 8, chain[..., 7], -1)
+    result = np.where(spread_year >= 9, chain[..., 8], -1)
+
+    # 4. Disp/Env
+    has_disp_env = ~no_disp_env[bid]
+    disp = np.where(has_disp_env, spread_ids[0][spread_slots[spread_year, bid]], -1)
+    env = np.where(has_disp_env, spread_ids[spread_year, spread_slots[0][bid]], -1)
+
+    valid = ~joker & (period_idx < spread_year)
+    cards = {
+        "birth_card": bid,
+        "period_card": period_card,
+        "long_range": long_range,
+        "pluto": pluto,
+        "result": result,
+        "displacement": disp,
+        "environment": env,
+    }
+    cards = {key: np.where(valid, ids, -1).astype(np.int16) for key, ids in cards.items()}
+    out = {
+        "valid": valid,
         "age": age,
         "spread_year": spread_year,
-        "period": {
-            "card": period_card,
-            "planet": planet,
-            "days_since": days_since
-        },
-        "year_long": {
-            "long_range": long_range,
-            "pluto": pluto,
-            "result": result,
-            "displacement": disp,
-            "environment": env
-        }
+        "days_since": days_since,
+        "period_idx": period_idx,
+        **cards,
     }
+    if names:
+        for key in cards:
+            out[key] = _CARD_NAME_ARRAY[out[key]]
+        out["planet"] = _ROW_NAME_ARRAY[period_idx]
+    return out
 
 if __name__ == "__main__":
     # Test Case 1: 8♦ (Feb 17 1991), effective Feb 21 2026
@@ -0,0 +1,206 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose circuit breaker is open."""
+
+class CircuitBreaker:
+    """
+    Fails fast while a provider is down.
+
+    Opens after `failure_threshold` consecutive failed calls; while open every
+    call raises CircuitOpenError. After `reset_timeout` seconds one trial call
+    is let through (half-open): success closes the breaker, failure re-opens it.
+    Shared by the sync and async clients of a provider; thread-safe.
+    """
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_started = None  # A trial that never reports back is replaced after reset_timeout
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if time.monotonic() - self.opened_at >= self.reset_timeout else "open"
+
+    def before_call(self):
+        with self._lock:
+            if self.opened_at is None:
+                return
+            now = time.monotonic()
+            trial_pending = self._trial_started is not None and now - self._trial_started < self.reset_timeout
+            if now - self.opened_at < self.reset_timeout or trial_pending:
+                raise CircuitOpenError(f"{self.name} circuit is open; failing fast.")
+            self._trial_started = now
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_started = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_started is not None or self.failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    logger.error(f"{self.name} circuit opened after {self.failures} consecutive failures.")
+                self.opened_at = time.monotonic()
+            self._trial_started = None
+
+class _RetryPolicy:
+    """Which attempts to retry, and how long to wait, for ProviderClient and AsyncProviderClient."""
+
+    def __init__(self, name, max_retries, backoff, max_backoff):
+        self.name = name
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    @staticmethod
+    def can_retry(method, headers, sent):
+        # A request that may have reached the provider is only repeated when that is safe
+        return not sent or method.upper() in ("GET", "HEAD", "OPTIONS", "PUT", "DELETE") \
+            or any(k.lower() == "idempotency-key" for k in (headers or {}))
+
+    def delay(self, attempt, retry_after=None):
+        if retry_after is not None:
+            try:
+                return min(self.max_backoff, float(retry_after))
+            except ValueError:
+                pass
+        return min(self.max_backoff, self.backoff * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+    def log_retry(self, method, url, reason, attempt, delay):
+        logger.warning(f"{self.name} {method} {url} {reason}; retry {attempt + 1}/{self.max_retries} in {delay:.2f}s")
+
+def _never_sent(error):
+    """True for requests errors raised before the request could reach the server."""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+class ProviderClient:
+    """
+    Pooled, time-bounded HTTP client for one provider (requests.Session).
+
+    Keeps connections alive across calls, applies (connect, read) timeouts
+    to every call, retries 429/5xx responses and connection errors with
+    jittered exponential backoff (honouring Retry-After), and goes through a
+    CircuitBreaker. POSTs are only retried when they cannot have reached the
+    provider, or carry an Idempotency-Key.
+    """
+
+    def __init__(self, name, breaker, connect_timeout=3.05, read_timeout=30.0, max_retries=3, backoff=0.5,
+                 max_backoff=30.0, pool_size=20):
+        self.name = name
+        self.breaker = breaker
+        self.timeout = (connect_timeout, read_timeout)
+        self.retry = _RetryPolicy(name, max_retries, backoff, max_backoff)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        headers = kwargs.get("headers")
+        for attempt in range(self.retry.max_retries + 1):
+            self.breaker.before_call()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self.breaker.record_failure()
+                sent = not _never_sent(e)
+                if attempt == self.retry.max_retries or not self.retry.can_retry(method, headers, sent):
+                    raise
+                delay = self.retry.delay(attempt)
+                self.retry.log_retry(method, url, f"failed ({type(e).__name__})", attempt, delay)
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    self.breaker.record_success()
+                    return response
+                self.breaker.record_failure()
+                sent = response.status_code != 429  # A 429 was not processed
+                if attempt == self.retry.max_retries or not self.retry.can_retry(method, headers, sent):
+                    return response
+                delay = self.retry.delay(attempt, response.headers.get("Retry-After"))
+                self.retry.log_retry(method, url, f"returned {response.status_code}", attempt, delay)
+            time.sleep(delay)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+class AsyncProviderClient:
+    """ProviderClient for the event loop, on httpx.AsyncClient; same timeouts, retries and breaker."""
+
+    def __init__(self, name, breaker, connect_timeout=3.05, read_timeout=30.0, max_retries=3, backoff=0.5,
+                 max_backoff=30.0, pool_size=20):
+        self.name = name
+        self.breaker = breaker
+        self.retry = _RetryPolicy(name, max_retries, backoff, max_backoff)
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size))
+
+    async def request(self, method, url, **kwargs):
+        headers = kwargs.get("headers")
+        for attempt in range(self.retry.max_retries + 1):
+            self.breaker.before_call()
+            try:
+                response = await self.client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                self.breaker.record_failure()
+                sent = not isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout))
+                if attempt == self.retry.max_retries or not self.retry.can_retry(method, headers, sent):
+                    raise
+                delay = self.retry.delay(attempt)
+                self.retry.log_retry(method, url, f"failed ({type(e).__name__})", attempt, delay)
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    self.breaker.record_success()
+                    return response
+                self.breaker.record_failure()
+                sent = response.status_code != 429
+                if attempt == self.retry.max_retries or not self.retry.can_retry(method, headers, sent):
+                    return response
+                delay = self.retry.delay(attempt, response.headers.get("Retry-After"))
+                self.retry.log_retry(method, url, f"returned {response.status_code}", attempt, delay)
+            await asyncio.sleep(delay)
+
+    async def get(self, url, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request("POST", url, **kwargs)
+
+    async def close(self):
+        await self.client.aclose()
+
+    @property
+    def is_closed(self):
+        return self.client.is_closed
@@ -1,67 +1,272 @@
+import collections
+import hashlib
 import json
 import logging
 import random
 import os
-import requests
+import re
+import sqlite3
+import threading
 import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from .http_clients import AsyncProviderClient, CircuitBreaker, ProviderClient
 
 logger = logging.getLogger(__name__)
 
+# ====================== HTTP CLIENTS ======================
+# One pooled keep-alive client per provider, with per-call timeouts, jittered
+# retries on 429/5xx and a circuit breaker shared by its sync and async clients.
+
+def _breaker(name):
+    return CircuitBreaker(name, failure_threshold=int(os.getenv("HTTP_BREAKER_FAILURES", "5")),
+                          reset_timeout=float(os.getenv("HTTP_BREAKER_RESET_SECONDS", "30")))
+
+TIKTOK_BREAKER = _breaker("TikTok")
+LOB_BREAKER = _breaker("Lob")
+
+TIKTOK_READ_TIMEOUT = 10
+LOB_READ_TIMEOUT = 30  # Seconds; letter uploads carry the PDF
+
+def _client_options(read_timeout):
+    return {
+        "connect_timeout": float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.05")),
+        "read_timeout": read_timeout,
+        "max_retries": int(os.getenv("HTTP_MAX_RETRIES", "3")),
+    }
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+def _shared(key, factory):
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _clients[key] = factory()
+    return client
+
+def tiktok_client():
+    return _shared("tiktok", lambda: ProviderClient("TikTok", TIKTOK_BREAKER, **_client_options(TIKTOK_READ_TIMEOUT)))
+
+def lob_client():
+    return _shared("lob", lambda: ProviderClient("Lob", LOB_BREAKER, **_client_options(LOB_READ_TIMEOUT)))
+
+def lob_async_client():
+    """Lob client for the server's event loop."""
+    client = _clients.get("lob_async")
+    if client is None or client.is_closed:
+        with _clients_lock:
+            client = _clients["lob_async"] = AsyncProviderClient("Lob", LOB_BREAKER, **_client_options(LOB_READ_TIMEOUT))
+    return client
+
+async def close_async_client():
+    client = _clients.pop("lob_async", None)
+    if client is not None:
+        await client.close()
+
 # ====================== TIKTOK SHOP INTEGRATION ======================
 
-def fetch_tiktok_order(order_id: str):
+TIKTOK_ORDER_DETAIL_URL = "https://open-api.tiktokglobalshop.com/api/orders/detail/query"
+TIKTOK_MAX_ORDERS_PER_QUERY = 50
+
+# Order statuses in which the buyer has paid and the order is not cancelled: only these are fulfilled.
+# ON_HOLD is paid but still inside the buyer's cancellation window.
+TIKTOK_PAID_STATUSES = {"AWAITING_SHIPMENT", "PARTIALLY_SHIPPING", "AWAITING_COLLECTION", "IN_TRANSIT", "DELIVERED",
+                        "COMPLETED"}
+# The order detail query reports statuses as codes
+TIKTOK_ORDER_STATUS_CODES = {100: "UNPAID", 105: "ON_HOLD", 111: "AWAITING_SHIPMENT", 112: "AWAITING_COLLECTION",
+                             114: "PARTIALLY_SHIPPING", 121: "IN_TRANSIT", 122: "DELIVERED", 130: "COMPLETED",
+                             140: "CANCELLED"}
+
+class TikTokError(Exception):
+    """TikTok Shop could not be asked, or did not answer, an order query (missing credentials, API or transport error)."""
+
+def _parse_tiktok_order(order_id, order_data):
+    addr = order_data.get("recipient_address", {})
+    status = order_data.get("order_status")
+    return {
+        "order_id": order_id,
+        "status": TIKTOK_ORDER_STATUS_CODES.get(status, status),
+        "customer": {
+            "first_name": addr.get("name", "Customer"),
+            "email": order_data.get("buyer_email", ""),
+            "birth_date": order_data.get("birth_date")  # TikTok doesn't provide birthdate by default
+        },
+        "shipping_address": {
+            "name": addr.get("name"),
+            "address_line1": addr.get("address_line1"),
+            "city": addr.get("city"),
+            "state": addr.get("state"),
+            "zip_code": addr.get("zip_code"),
+            "country": "US"
+        }
+    }
+
+def fetch_tiktok_orders(order_ids):
     """
-    Fetches order details from TikTok Shop API using App Key and Secret.
+    Fetches several orders with one TikTok Shop detail query (up to 50 ids).
+    Returns {order_id: order} for the orders TikTok returned; raises TikTokError on
+    errors or missing credentials.
     """
     app_key = os.getenv("TIKTOK_APP_KEY")
     app_secret = os.getenv("TIKTOK_APP_SECRET")
     access_token = os.getenv("TIKTOK_ACCESS_TOKEN")
     
     if not all([app_key, app_secret, access_token]):
-        logger.warning("TikTok credentials missing (specifically TIKTOK_ACCESS_TOKEN). Falling back to mock data.")
-        return mock_tiktok_order(order_id)
+        raise TikTokError("TikTok credentials missing (TIKTOK_APP_KEY, TIKTOK_APP_SECRET, TIKTOK_ACCESS_TOKEN).")
 
     # Simplified TikTok API call structure
-    url = f"https://open-api.tiktokglobalshop.com/api/orders/detail/query"
     params = {
         "app_key": app_key,
         "access_token": access_token,
         "timestamp": int(time.time()),
-        "order_id_list": json.dumps([order_id])
+        "order_id_list": json.dumps(list(order_ids))
     }
     
     try:
-        response = requests.get(url, params=params)
+        response = tiktok_client().get(TIKTOK_ORDER_DETAIL_URL, params=params)
         data = response.json()
-        
-        if data.get("code") == 0 and data.get("data", {}).get("order_list"):
-            order_data = data["data"]["order_list"][0]
-            addr = order_data.get("recipient_address", {})
-            return {
-                "order_id": order_id,
-                "customer": {
-                    "first_name": addr.get("name", "Customer"),
-                    "email": order_data.get("buyer_email", ""),
-                    "birth_date": "1991-02-17" # Placeholder: TikTok doesn't provide birthdate by default
-                },
-                "shipping_address": {
-                    "name": addr.get("name"),
-                    "address_line1": addr.get("address_line1"),
-                    "city": addr.get("city"),
-                    "state": addr.get("state"),
-                    "zip_code": addr.get("zip_code"),
-                    "country": "US"
-                }
-            }
     except Exception as e:
-        logger.error(f"TikTok API Error: {e}")
-        
-    return mock_tiktok_order(order_id)
+        raise TikTokError(f"TikTok API Error: {e}") from e
+
+    if data.get("code") != 0:
+        raise TikTokError(f"TikTok API Error: {data.get('message')}")
+    orders = {}
+    for order_data in data.get("data", {}).get("order_list") or []:
+        order_id = str(order_data.get("order_id") or order_data.get("id"))
+        orders[order_id] = _parse_tiktok_order(order_id, order_data)
+    return orders
+
+class TTLCache:
+    """Thread-safe map whose entries expire `ttl` seconds after they are stored; keeps at most max_size."""
+
+    def __init__(self, ttl, max_size=10_000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = collections.OrderedDict()  # key -> (expires_at, value), oldest first
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            return entry[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+class TikTokOrderBatcher:
+    """
+    Coalesces order lookups into batched detail queries.
+
+    Ids submitted within `window` seconds of each other (or until max_batch
+    are waiting) are fetched with one query on a background thread. Parsed
+    orders stay in a TTL cache, and an id already waiting or in flight joins
+    that lookup, so repeated lookups never leave the process. An order
+    TikTok did not return resolves to None, and a failed query to its
+    exception; neither is cached, so the next lookup asks TikTok again.
+    """
+
+    def __init__(self, fetch=None, window=0.05, max_batch=TIKTOK_MAX_ORDERS_PER_QUERY, ttl=300.0, cache_size=10_000):
+        self.fetch = fetch or fetch_tiktok_orders
+        self.window = window
+        self.max_batch = max_batch
+        self.cache = TTLCache(ttl, cache_size)
+        self._pending = {}  # order_id -> Future, not yet dispatched
+        self._in_flight = {}  # order_id -> Future, being fetched
+        self._timer = None
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="tiktok-orders")
+        self.queries = 0
+
+    def submit(self, order_id):
+        """Returns a Future for the order (None if not found); never blocks, so the webhook can prefetch."""
+        order_id = str(order_id)
+        cached = self.cache.get(order_id)
+        if cached is not None:
+            future = Future()
+            future.set_result(cached)
+            return future
+        with self._lock:
+            future = self._pending.get(order_id) or self._in_flight.get(order_id)
+            if future is None:
+                future = self._pending[order_id] = Future()
+                if len(self._pending) >= self.max_batch:
+                    self._dispatch_locked()
+                elif self._timer is None:
+                    self._timer = threading.Timer(self.window, self._dispatch)
+                    self._timer.daemon = True
+                    self._timer.start()
+        return future
+
+    def get(self, order_id, timeout=None):
+        return self.submit(order_id).result(timeout)
+
+    def _dispatch(self):
+        with self._lock:
+            self._dispatch_locked()
+
+    def _dispatch_locked(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+        if batch:
+            self._in_flight.update(batch)
+            self._executor.submit(self._run, batch)
+
+    def _run(self, batch):
+        self.queries += 1
+        try:
+            orders, error = self.fetch(list(batch)), None
+        except Exception as e:
+            logger.error(f"TikTok batch fetch failed: {e}")
+            orders, error = {}, e
+        for order_id, future in batch.items():
+            order = orders.get(order_id)
+            if order is not None:
+                self.cache.put(order_id, order)
+            with self._lock:
+                self._in_flight.pop(order_id, None)
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(order)
+
+def tiktok_orders():
+    """Process-wide TikTokOrderBatcher."""
+    return _shared("tiktok_orders", lambda: TikTokOrderBatcher(
+        window=float(os.getenv("TIKTOK_BATCH_WINDOW_MS", "50")) / 1000,
+        max_batch=int(os.getenv("TIKTOK_BATCH_MAX", str(TIKTOK_MAX_ORDERS_PER_QUERY))),
+        ttl=float(os.getenv("TIKTOK_ORDER_TTL_SECONDS", "300"))))
+
+def fetch_tiktok_order(order_id: str):
+    """
+    Fetches order details from TikTok Shop API using App Key and Secret.
+    Batched with concurrent lookups and cached; see TikTokOrderBatcher.
+    Returns None if TikTok has no such order and raises TikTokError if TikTok
+    could not be asked. TIKTOK_MOCK_ORDERS=1 returns mock orders instead (local
+    development only: never set it where letters are really mailed).
+    """
+    if os.getenv("TIKTOK_MOCK_ORDERS") == "1":
+        return mock_tiktok_order(order_id)
+    return tiktok_orders().get(order_id)
 
 def mock_tiktok_order(order_id):
     logger.info(f"Using mock data for order {order_id}")
     return {
         "order_id": order_id,
+        "status": "AWAITING_SHIPMENT",
         "customer": {"first_name": "Cassidy", "birth_date": "1991-02-17"},
         "shipping_address": {
             "name": "Cassidy Williams", 
@@ -75,19 +280,18 @@ def mock_tiktok_order(order_id):
 
 # ====================== LOB INTEGRATION ======================
 
-def send_letter_via_lob(pdf_path: str, address: dict):
-    """
-    Sends a physical letter via Lob API using the provided API Key.
-    """
-    api_key = os.getenv("LOB_API_KEY")
-    if not api_key:
-        logger.error("LOB_API_KEY not found in environment.")
-        return {"id": "MOCK_LOB_ID", "status": "mocked"}
+class LobError(Exception):
+    """Lob refused or failed a request; status_code is None when no response came back."""
 
-    url = "https://api.lob.com/v1/letters"
-    
-    # Lob payload structure
-    data_payload = {
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+def lob_url(resource):
+    return f"{os.getenv('LOB_API_BASE', 'https://api.lob.com/v1').rstrip('/')}/{resource}"
+
+def _lob_letter_payload(address: dict):
+    payload = {
         "description": f"Analog Algorithm Letter for {address['name']}",
         "to[name]": address["name"],
         "to[address_line1]": address["address_line1"],
@@ -103,20 +307,264 @@ def send_letter_via_lob(pdf_path: str, address: dict):
         "from[address_country]": "US",
         "color": "true"
     }
+    if address.get("address_line2"):
+        payload["to[address_line2]"] = address["address_line2"]
+    return payload
 
+def _lob_letter_result(status_code, result):
+    if status_code == 200:
+        logger.info(f"Letter sent via Lob! ID: {result['id']}")
+        return result
+    logger.error(f"Lob Error: {result.get('error', {}).get('message')}")
+    return {"id": "ERROR", "status": "failed"}
+
+def submit_lob_letter(pdf, address: dict, idempotency_key, client=None, api_key=None):
+    """Creates one Lob letter and returns Lob's JSON; raises LobError (or a transport error) on failure."""
+    if not isinstance(pdf, (bytes, bytearray)):
+        with open(pdf, 'rb') as f:
+            pdf = f.read()  # Bytes, so a retried upload resends the whole file
+    response = (client or lob_client()).post(
+        lob_url("letters"), auth=(api_key or os.getenv("LOB_API_KEY"), ""), data=_lob_letter_payload(address),
+        files={"file": ("letter.pdf", pdf, "application/pdf")},
+        headers={"Idempotency-Key": idempotency_key})
     try:
-        with open(pdf_path, 'rb') as f:
-            files = {"file": f}
-            response = requests.post(url, auth=(api_key, ""), data=data_payload, files=files)
-            
         result = response.json()
-        if response.status_code == 200:
-            logger.info(f"Letter sent via Lob! ID: {result['id']}")
-            return result
-        else:
-            logger.error(f"Lob Error: {result.get('error', {}).get('message')}")
-            return {"id": "ERROR", "status": "failed"}
-            
+    except ValueError:
+        result = {}
+    if response.status_code != 200:
+        message = result.get("error", {}).get("message") or f"HTTP {response.status_code}"
+        raise LobError(message, response.status_code)
+    return result
+
+def send_letter_via_lob(pdf, address: dict, idempotency_key=None):
+    """
+    Sends a physical letter via Lob API using the provided API Key.
+    `pdf` is the rendered letter as bytes, or a path to a PDF on disk.
+    The Idempotency-Key (random unless given) lets retries never double-mail.
+    """
+    api_key = os.getenv("LOB_API_KEY")
+    if not api_key:
+        logger.error("LOB_API_KEY not found in environment.")
+        return {"id": "MOCK_LOB_ID", "status": "mocked"}
+
+    try:
+        result = submit_lob_letter(pdf, address, idempotency_key or uuid.uuid4().hex, api_key=api_key)
+        logger.info(f"Letter sent via Lob! ID: {result['id']}")
+        return result
+    except LobError as e:
+        logger.error(f"Lob Error: {e}")
+        return {"id": "ERROR", "status": "failed"}
     except Exception as e:
         logger.error(f"Lob Integration Error: {e}")
         return {"id": "ERROR", "status": "failed"}
+
+async def send_letter_via_lob_async(pdf: bytes, address: dict, idempotency_key=None):
+    """Async send_letter_via_lob for the server: the upload never blocks the event loop."""
+    api_key = os.getenv("LOB_API_KEY")
+    if not api_key:
+        logger.error("LOB_API_KEY not found in environment.")
+        return {"id": "MOCK_LOB_ID", "status": "mocked"}
+
+    try:
+        response = await lob_async_client().post(
+            lob_url("letters"), auth=(api_key, ""), data=_lob_letter_payload(address),
+            files={"file": ("letter.pdf", pdf, "application/pdf")},
+            headers={"Idempotency-Key": idempotency_key or uuid.uuid4().hex})
+        return _lob_letter_result(response.status_code, response.json())
+    except Exception as e:
+        logger.error(f"Lob Integration Error: {e}")
+        return {"id": "ERROR", "status": "failed"}
+
+# ====================== LOB ADDRESS VERIFICATION ======================
+
+LOB_VERIFY_BATCH_SIZE = 20  # Addresses per bulk US verification request (Lob's limit)
+DELIVERABLE = {"deliverable", "deliverable_unnecessary_unit", "deliverable_incorrect_unit", "deliverable_missing_unit"}
+
+def canonical_address(address: dict):
+    """Address fields that decide deliverability, upper-cased with punctuation and spacing collapsed."""
+    def clean(value):
+        return " ".join(re.sub(r"[.,#]", " ", str(value or "")).upper().split())
+    return {
+        "address_line1": clean(address.get("address_line1")),
+        "address_line2": clean(address.get("address_line2")),
+        "city": clean(address.get("city")),
+        "state": clean(address.get("state")),
+        "zip_code": clean(address.get("zip_code"))[:5],
+    }
+
+def address_hash(address: dict):
+    """Cache key for an address: the same location in any spelling Lob would accept hashes the same."""
+    return hashlib.sha256(json.dumps(canonical_address(address), sort_keys=True).encode()).hexdigest()
+
+class AddressCache:
+    """
+    Verified addresses in a SQLite file, keyed by address_hash.
+
+    Entries expire `ttl` seconds after verification, so an address is
+    re-checked against Lob now and then but not on every monthly run.
+    Safe to share across threads.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS addresses (
+            hash TEXT PRIMARY KEY,
+            deliverability TEXT NOT NULL,
+            address TEXT NOT NULL,
+            verified_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS addresses_verified ON addresses (verified_at);
+    """
+
+    def __init__(self, path, ttl=90 * 86400):
+        self.path = path
+        self.ttl = ttl
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False, timeout=30)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(self.SCHEMA)
+
+    def get_many(self, hashes):
+        """Returns {hash: (deliverability, normalized address)} for the unexpired entries among hashes."""
+        hashes = list(hashes)
+        found = {}
+        with self._lock:
+            for i in range(0, len(hashes), 500):  # Stay under SQLite's bound-parameter limit
+                chunk = hashes[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT hash, deliverability, address FROM addresses WHERE verified_at >= ? "
+                    f"AND hash IN ({','.join('?' * len(chunk))})",
+                    [time.time() - self.ttl, *chunk]).fetchall()
+                found.update((h, (deliverability, json.loads(address))) for h, deliverability, address in rows)
+        return found
+
+    def put_many(self, entries):
+        """Stores (hash, deliverability, normalized address) entries and drops expired ones."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO addresses (hash, deliverability, address, verified_at) VALUES (?, ?, ?, ?)",
+                    [(h, deliverability, json.dumps(address), now) for h, deliverability, address in entries])
+                self._conn.execute("DELETE FROM addresses WHERE verified_at < ?", (now - self.ttl,))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+def _lob_verification_request(address: dict):
+    return {
+        "primary_line": address.get("address_line1") or "",
+        "secondary_line": address.get("address_line2") or "",
+        "city": address.get("city") or "",
+        "state": address.get("state") or "",
+        "zip_code": address.get("zip_code") or "",
+    }
+
+def _lob_normalized_address(verification: dict):
+    components = verification.get("components") or {}
+    zip_code = components.get("zip_code") or ""
+    if zip_code and components.get("zip_code_plus_4"):
+        zip_code = f"{zip_code}-{components['zip_code_plus_4']}"
+    address = {
+        "address_line1": verification.get("primary_line") or "",
+        "city": components.get("city") or "",
+        "state": components.get("state") or "",
+        "zip_code": zip_code,
+    }
+    if verification.get("secondary_line"):
+        address["address_line2"] = verification["secondary_line"]
+    return address
+
+class AddressVerifier:
+    """
+    Checks mailing addresses with Lob's bulk US verification before we pay for a letter.
+
+    verify_many() answers from the AddressCache where it can and sends only
+    new or changed addresses to Lob, up to batch_size per request. Results
+    are dicts with deliverability, deliverable (None when the address could
+    not be verified, e.g. no LOB_API_KEY or Lob down; those are not cached)
+    and address: Lob's normalized form, keeping the input's name.
+    """
+
+    def __init__(self, cache, client=None, batch_size=LOB_VERIFY_BATCH_SIZE):
+        self.cache = cache
+        self.client = client
+        self.batch_size = batch_size
+        self.requests = 0
+
+    def verify(self, address: dict):
+        return self.verify_many([address])[0]
+
+    def verify_many(self, addresses):
+        addresses = list(addresses)
+        hashes = [address_hash(address) for address in addresses]
+        known = self.cache.get_many(set(hashes))
+        missing = {}  # hash -> first input address with it
+        for h, address in zip(hashes, addresses):
+            if h not in known:
+                missing.setdefault(h, address)
+        if missing:
+            known.update(self._verify_with_lob(missing))
+
+        results = []
+        for h, address in zip(hashes, addresses):
+            deliverability, normalized = known.get(h, ("unverified", None))
+            results.append({
+                "deliverability": deliverability,
+                "deliverable": None if normalized is None else deliverability in DELIVERABLE,
+                "address": {"name": address.get("name"), **normalized} if normalized else address,
+            })
+        return results
+
+    def _verify_with_lob(self, missing):
+        api_key = os.getenv("LOB_API_KEY")
+        if not api_key:
+            logger.error("LOB_API_KEY not found in environment; addresses not verified.")
+            return {}
+        verified, entries = {}, []
+        items = list(missing.items())
+        for i in range(0, len(items), self.batch_size):
+            batch = items[i:i + self.batch_size]
+            self.requests += 1
+            try:
+                response = (self.client or lob_client()).post(
+                    lob_url("bulk/us_verifications"), auth=(api_key, ""),
+                    json={"addresses": [_lob_verification_request(address) for _, address in batch]})
+                result = response.json()
+                if response.status_code != 200:
+                    raise LobError(result.get("error", {}).get("message") or f"HTTP {response.status_code}",
+                                   response.status_code)
+            except Exception as e:
+                logger.error(f"Lob address verification failed for {len(batch)} addresses: {e}")
+                continue
+            for (h, _), verification in zip(batch, result.get("addresses", [])):
+                if "error" in verification:  # Malformed input: reject it now, look again once it is fixed
+                    logger.warning(f"Lob could not verify an address: {verification['error'].get('message')}")
+                    verified[h] = ("undeliverable", {})
+                    continue
+                normalized = _lob_normalized_address(verification)
+                deliverability = verification.get("deliverability", "undeliverable")
+                verified[h] = (deliverability, normalized)
+                entries.append((h, deliverability, normalized))
+                if deliverability in DELIVERABLE:  # Next month's lookup may already use the normalized form
+                    entries.append((address_hash(normalized), deliverability, normalized))
+        if entries:
+            self.cache.put_many(entries)
+        return verified
+
+def address_verifier():
+    """Process-wide AddressVerifier on the LOB_ADDRESS_CACHE_DB cache."""
+    return _shared("address_verifier", lambda: AddressVerifier(AddressCache(
+        os.getenv("LOB_ADDRESS_CACHE_DB", "address_cache.db"),
+        ttl=float(os.getenv("LOB_ADDRESS_CACHE_DAYS", "90")) * 86400)))
+
+def verify_address(address: dict):
+    """Verifies one mailing address (cached); see AddressVerifier."""
+    return address_verifier().verify(address)
@@ -0,0 +1,209 @@
+import json
+import logging
+import random
+import sqlite3
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+class JobFailed(Exception):
+    """Raised by a job handler to fail the job immediately, without retrying (e.g. invalid input)."""
+
+class JobQueue:
+    """
+    Durable job queue in a SQLite file.
+
+    Jobs move queued -> running -> succeeded | failed. A claim is a lease: a
+    job whose worker died (process restart, crash) is picked up again once
+    its lease expires, so queued and in-flight work survives restarts; a
+    job that already used max_attempts fails instead. The attempt number
+    identifies the lease, so a worker that lost its lease cannot record a
+    result over the worker that reclaimed the job.
+    Safe to share across threads, and across processes using the same file.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            state TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL,
+            run_after REAL NOT NULL,
+            lease_until REAL,
+            result TEXT,
+            error TEXT,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (state, run_after);
+    """
+
+    def __init__(self, path, lease_seconds=300):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self.wakeup = threading.Event()  # Set on enqueue so idle workers start at once
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")  # WAL: survives app crashes without an fsync per job
+            self._conn.executescript(self.SCHEMA)
+
+    def enqueue(self, kind, payload, max_attempts=5):
+        """Adds a job and returns its id."""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, payload, state, max_attempts, run_after, created_at, updated_at) "
+                "VALUES (?, ?, ?, 'queued', ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(payload), max_attempts, now, now, now))
+        self.wakeup.set()
+        return job_id
+
+    def claim(self):
+        """Leases the oldest ready job (queued and due, or running with an expired lease); None if idle."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "UPDATE jobs SET state = 'failed', lease_until = NULL, updated_at = ?, "
+                    "error = 'Lease expired on the last attempt' || COALESCE(' (' || error || ')', '') "
+                    "WHERE state = 'running' AND lease_until < ? AND attempts >= max_attempts",
+                    (now, now))
+                row = self._conn.execute(
+                    "SELECT * FROM jobs WHERE (state = 'queued' AND run_after <= ?) "
+                    "OR (state = 'running' AND lease_until < ?) ORDER BY run_after LIMIT 1",
+                    (now, now)).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE jobs SET state = 'running', attempts = attempts + 1, lease_until = ?, "
+                        "updated_at = ? WHERE id = ?",
+                        (now + self.lease_seconds, now, row["id"]))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        job = dict(row)
+        job["attempts"] += 1
+        job["payload"] = json.loads(job["payload"])
+        return job
+
+    def complete(self, job_id, attempt, result=None):
+        """Records the result of claimed attempt `attempt`; False if that lease was lost to another worker."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET state = 'succeeded', result = ?, error = NULL, lease_until = NULL, updated_at = ? "
+                "WHERE id = ? AND state = 'running' AND attempts = ?",
+                (json.dumps(result, default=str), time.time(), job_id, attempt))
+        return cursor.rowcount == 1
+
+    def fail(self, job_id, attempt, error, retry_in=None):
+        """
+        Records a failed attempt: requeued after retry_in seconds, or failed for good when retry_in is None.
+        False if the lease of attempt `attempt` was lost to another worker.
+        """
+        now = time.time()
+        with self._lock:
+            if retry_in is None:
+                cursor = self._conn.execute(
+                    "UPDATE jobs SET state = 'failed', error = ?, lease_until = NULL, updated_at = ? "
+                    "WHERE id = ? AND state = 'running' AND attempts = ?",
+                    (error, now, job_id, attempt))
+            else:
+                cursor = self._conn.execute(
+                    "UPDATE jobs SET state = 'queued', error = ?, run_after = ?, lease_until = NULL, updated_at = ? "
+                    "WHERE id = ? AND state = 'running' AND attempts = ?",
+                    (error, now + retry_in, now, job_id, attempt))
+        return cursor.rowcount == 1
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def counts(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        return {state: count for state, count in rows}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class JobWorkers:
+    """
+    Worker threads draining a JobQueue.
+
+    handlers maps a job kind to a callable taking the payload and returning a
+    JSON-serializable result. An exception retries the job with exponential
+    backoff and jitter until max_attempts; JobFailed fails it at once.
+    """
+
+    def __init__(self, queue, handlers, concurrency=2, backoff=2.0, max_backoff=300.0, poll_interval=1.0):
+        self.queue = queue
+        self.handlers = handlers
+        self.concurrency = concurrency
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        for i in range(self.concurrency):
+            thread = threading.Thread(target=self._run, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=None):
+        """Stops claiming new jobs and waits for running ones (unfinished leases are retried on restart)."""
+        self._stop.set()
+        self.queue.wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _run(self):
+        while not self._stop.is_set():
+            job = self.queue.claim()
+            if job is None:
+                self.queue.wakeup.wait(self.poll_interval)
+                self.queue.wakeup.clear()
+                continue
+            self.run_job(job)
+
+    def run_job(self, job):
+        attempt = job["attempts"]
+        try:
+            result = self.handlers[job["kind"]](job["payload"])
+        except JobFailed as e:
+            logger.error(f"Job {job['id']} ({job['kind']}) failed: {e}")
+            recorded = self.queue.fail(job["id"], attempt, str(e))
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            if attempt >= job["max_attempts"]:
+                logger.error(f"Job {job['id']} ({job['kind']}) failed after {attempt} attempts: {error}")
+                recorded = self.queue.fail(job["id"], attempt, error)
+            else:
+                delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+                logger.warning(f"Job {job['id']} ({job['kind']}) attempt {attempt} failed ({error}); "
+                               f"retrying in {delay:.1f}s")
+                recorded = self.queue.fail(job["id"], attempt, error, retry_in=delay)
+        else:
+            recorded = self.queue.complete(job["id"], attempt, result)
+        if not recorded:
+            logger.warning(f"Job {job['id']} ({job['kind']}) attempt {attempt} outlived its lease; outcome discarded")
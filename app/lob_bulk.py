@@ -0,0 +1,168 @@
+import collections
+import csv
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from . import integrations
+
+logger = logging.getLogger(__name__)
+
+REPORT_FIELDS = ["subscriber_id", "month", "idempotency_key", "status", "letter_id", "http_status", "error", "seconds"]
+
+# Fixed namespace: the same (subscriber, month) always maps to the same Lob idempotency key
+IDEMPOTENCY_NAMESPACE = uuid.UUID("5c1f6f2e-8a52-4c3e-9b1e-6f7a0e1d2c3b")
+
+def letter_idempotency_key(subscriber_id, month):
+    """Stable Lob Idempotency-Key for one subscriber's letter for one month."""
+    return str(uuid.uuid5(IDEMPOTENCY_NAMESPACE, f"letter:{subscriber_id}:{month}"))
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, bursts of up to `capacity`.
+
+    acquire() blocks until a token is available. The capacity is at least one
+    token, or a rate below 1/s could never fill the bucket.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = max(1.0, capacity or rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+def _chunks(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _sent_letters(report_path):
+    """{(subscriber_id, month): row} for the letters an earlier report at report_path records as sent."""
+    if not report_path or not os.path.exists(report_path):
+        return {}
+    with open(report_path, newline="", encoding="utf-8") as f:
+        return {(row["subscriber_id"], row["month"]): row for row in csv.DictReader(f)
+                if row["status"] in ("sent", "already_sent")}
+
+def _finished(row):
+    future = Future()
+    future.set_result(row)
+    return future
+
+def send_letters_bulk(letters, concurrency=None, rate=None, burst=None, report_path=None, client=None,
+                      verifier=None):
+    """Submits letters to Lob concurrently under a token-bucket rate limit.
+
+    letters is an iterable of dicts with subscriber_id, month, pdf (bytes or path) and
+    address, consumed lazily. Every letter carries letter_idempotency_key(subscriber_id,
+    month), so retries within the lifetime of Lob's idempotency keys (about 24 hours)
+    never mail a subscriber twice. Beyond that, report_path is the record: when it
+    already holds a report from an earlier run, letters it records as sent are not
+    submitted again and are reported as already_sent (with their letter_id); sent rows
+    of that report that are not in this batch are kept.
+    Addresses are first checked in bulk by verifier (integrations.address_verifier() by
+    default): undeliverable ones are reported as such and not sent, the rest are sent in
+    Lob's normalized form.
+    Results are written to report_path (CSV) as they finish, in input order. Returns a
+    summary: counts, elapsed seconds, letters per second and latency percentiles.
+    """
+    concurrency = concurrency or int(os.getenv("LOB_BULK_CONCURRENCY", "16"))
+    verifier = verifier or integrations.address_verifier()
+    bucket = TokenBucket(rate or float(os.getenv("LOB_RATE_PER_SECOND", "25")), burst)
+    counts = collections.Counter()
+    latencies = collections.deque(maxlen=10_000)
+    already_sent = _sent_letters(report_path)
+    report_file = open(report_path, "w", newline="", encoding="utf-8") if report_path else None
+    report = csv.DictWriter(report_file, fieldnames=REPORT_FIELDS) if report_file else None
+    if report:
+        report.writeheader()
+
+    def submit(letter, check):
+        key = letter_idempotency_key(letter["subscriber_id"], letter["month"])
+        row = {"subscriber_id": letter["subscriber_id"], "month": letter["month"], "idempotency_key": key}
+        if check["deliverable"] is False:
+            row.update(status="undeliverable", error=check["deliverability"], seconds=0)
+            return row
+        bucket.acquire()
+        started = time.perf_counter()
+        try:
+            result = integrations.submit_lob_letter(letter["pdf"], check["address"], key, client=client)
+            row.update(status="sent", letter_id=result.get("id"), http_status=200)
+        except integrations.LobError as e:
+            row.update(status="failed", http_status=e.status_code, error=str(e))
+        except Exception as e:
+            row.update(status="failed", error=f"{type(e).__name__}: {e}")
+        row["seconds"] = round(time.perf_counter() - started, 4)
+        return row
+
+    def record(future):
+        row = future.result()
+        counts[row["status"]] += 1
+        if row["status"] == "sent":
+            latencies.append(row["seconds"])
+        elif row["status"] != "already_sent":
+            logger.error(f"Lob letter for {row['subscriber_id']} ({row['month']}) failed: {row.get('error')}")
+        if report:
+            report.writerow(row)
+
+    started = time.perf_counter()
+    in_flight = collections.deque()
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="lob") as pool:
+            for chunk in _chunks(letters, integrations.LOB_VERIFY_BATCH_SIZE):
+                keys = [(str(letter["subscriber_id"]), str(letter["month"])) for letter in chunk]
+                to_send = [letter for letter, key in zip(chunk, keys) if key not in already_sent]
+                checks = iter(verifier.verify_many(letter["address"] for letter in to_send) if to_send else ())
+                for letter, key in zip(chunk, keys):
+                    previous = already_sent.pop(key, None)
+                    if previous is not None:
+                        in_flight.append(_finished({**previous, "status": "already_sent", "error": "", "seconds": 0}))
+                    else:
+                        in_flight.append(pool.submit(submit, letter, next(checks)))
+                    while len(in_flight) >= concurrency * 4:
+                        record(in_flight.popleft())
+            while in_flight:
+                record(in_flight.popleft())
+    finally:
+        if report_file:
+            for row in already_sent.values():  # Keep the record of letters sent earlier, even if this run fails
+                report.writerow(row)
+            report_file.close()
+
+    elapsed = time.perf_counter() - started
+    ordered = sorted(latencies)
+
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] if ordered else 0.0
+
+    return {
+        "sent": counts["sent"],
+        "failed": counts["failed"],
+        "undeliverable": counts["undeliverable"],
+        "already_sent": counts["already_sent"],
+        "seconds": round(elapsed, 3),
+        "per_second": round(sum(counts.values()) / elapsed, 2) if elapsed else 0.0,
+        "latency_p50": pct(50),
+        "latency_p95": pct(95),
+        "report_path": report_path,
+    }
@@ -0,0 +1,185 @@
+import collections
+import logging
+import os
+import queue
+import random
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.message import EmailMessage
+
+logger = logging.getLogger(__name__)
+
+def is_retryable(error):
+    """Dropped connections, socket errors and 4xx replies are transient; 5xx and refused recipients are not."""
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code < 500
+    if isinstance(error, smtplib.SMTPException):  # e.g. SMTPRecipientsRefused
+        return False
+    return isinstance(error, OSError)
+
+class SmtpPool:
+    """
+    Pool of authenticated SMTP connections for batch delivery.
+
+    At most `size` connections are open; each is opened (STARTTLS + login when
+    configured) on first use and reused for later messages. A connection that
+    drops or times out is closed and replaced. Thread-safe: send() blocks until a
+    connection is free.
+    """
+
+    def __init__(self, host, port=587, username=None, password=None, starttls=True, size=4, timeout=30):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self.opened = 0
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            host=os.getenv("SMTP_HOST", "localhost"),
+            port=int(os.getenv("SMTP_PORT", "587")),
+            username=os.getenv("SMTP_USER") or None,
+            password=os.getenv("SMTP_PASSWORD") or None,
+            starttls=os.getenv("SMTP_STARTTLS", "1") == "1",
+            size=int(os.getenv("SMTP_POOL_SIZE", "4")),
+        )
+
+    def _connect(self):
+        conn = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                conn.starttls()
+            if self.username:
+                conn.login(self.username, self.password)
+        except Exception:
+            conn.close()
+            raise
+        with self._lock:
+            self.opened += 1
+        return conn
+
+    def send(self, message):
+        """Sends one EmailMessage on a pooled connection; a broken connection is discarded, not reused."""
+        with self._slots:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+            try:
+                conn.send_message(message)
+            except (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException):
+                self._idle.put(conn)  # smtplib already RSET the transaction; the session is still usable
+                raise
+            except Exception:
+                conn.close()
+                raise
+            self._idle.put(conn)
+
+    def close(self):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                conn.quit()
+            except OSError:  # Includes SMTPException
+                conn.close()
+
+def build_letter_email(sender, recipient, first_name, pdf_path, subject=None):
+    """Builds the letter email, reading the PDF attachment from disk only now (at send time)."""
+    msg = EmailMessage()
+    msg["From"] = sender
+    msg["To"] = recipient
+    msg["Subject"] = subject or f"{first_name}, your Analog Algorithm letter"
+    msg.set_content(f"Dear {first_name},\n\nYour letter for this month is attached.\n\n-- The Analog Algorithm\n")
+    with open(pdf_path, "rb") as f:
+        msg.add_attachment(f.read(), maintype="application", subtype="pdf", filename=os.path.basename(pdf_path))
+    return msg
+
+class EmailDelivery:
+    """
+    Bounded-concurrency delivery stage: `workers` threads share one SmtpPool.
+
+    submit() returns a Future resolving to the number of attempts used; a
+    message is retried up to max_attempts times with exponential backoff and
+    jitter on transient errors. stats() reports throughput and latency (over
+    the most recent 10,000 sends, so memory stays flat on long batches).
+    """
+
+    def __init__(self, pool, sender, workers=None, max_attempts=4, backoff=0.5, max_backoff=30.0):
+        self.pool = pool
+        self.sender = sender
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._executor = ThreadPoolExecutor(max_workers=workers or pool.size, thread_name_prefix="smtp")
+        self._lock = threading.Lock()
+        self._latencies = collections.deque(maxlen=10_000)
+        self.sent = self.failed = self.retries = 0
+        self.started = time.perf_counter()
+
+    @classmethod
+    def from_env(cls):
+        pool = SmtpPool.from_env()
+        return cls(pool, sender=os.getenv("SMTP_FROM") or pool.username or "letters@analogalgo.com")
+
+    def submit(self, recipient, first_name, pdf_path):
+        return self._executor.submit(self._deliver, recipient, first_name, pdf_path)
+
+    def _deliver(self, recipient, first_name, pdf_path):
+        started = time.perf_counter()
+        message = build_letter_email(self.sender, recipient, first_name, pdf_path)
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                self.pool.send(message)
+                break
+            except Exception as e:
+                if attempt == self.max_attempts or not is_retryable(e):
+                    with self._lock:
+                        self.failed += 1
+                    raise
+                delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+                logger.warning(f"SMTP send to {recipient} failed ({e}); retry {attempt}/{self.max_attempts - 1} "
+                               f"in {delay:.2f}s")
+                with self._lock:
+                    self.retries += 1
+                time.sleep(delay)
+        with self._lock:
+            self.sent += 1
+            self._latencies.append(time.perf_counter() - started)
+        return attempt
+
+    def stats(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            elapsed = time.perf_counter() - self.started
+
+        def pct(p):
+            return latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1000 if latencies else 0.0
+
+        return {
+            "sent": self.sent,
+            "failed": self.failed,
+            "retries": self.retries,
+            "connections_opened": self.pool.opened,
+            "per_second": self.sent / elapsed if elapsed else 0.0,
+            "latency_ms_p50": pct(50),
+            "latency_ms_p95": pct(95),
+            "latency_ms_max": latencies[-1] * 1000 if latencies else 0.0,
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self.pool.close()
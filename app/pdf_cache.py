@@ -0,0 +1,104 @@
+import collections
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+class PdfCache:
+    """
+    Content-addressed on-disk cache of rendered PDFs.
+
+    Entries are keyed by a SHA-256 of the template version and the render
+    inputs, stored under two levels of shard directories
+    (root/ab/cd/abcd....pdf), and evicted least-recently-used once the total
+    size exceeds max_bytes. Recency survives restarts through file mtimes.
+    """
+
+    def __init__(self, root, max_bytes=512 * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._entries = collections.OrderedDict()  # key -> size, least recently used first
+        self._total = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+        os.makedirs(root, exist_ok=True)
+        self._load()
+
+    @staticmethod
+    def key(template_version, render_inputs):
+        """Cache key for a template version and a JSON-serializable mapping of render inputs."""
+        payload = json.dumps([template_version, render_inputs], sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], key[2:4], f"{key}.pdf")
+
+    def _load(self):
+        found = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if name.endswith(".pdf"):
+                    st = os.stat(os.path.join(dirpath, name))
+                    found.append((st.st_mtime, name[:-4], st.st_size))
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._total += size
+        self._evict()
+
+    def get(self, key):
+        """Returns the cached PDF bytes for key, or None."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+                self._total -= self._entries.pop(key, 0)
+            return None
+
+        with self._lock:
+            self.hits += 1
+            if key not in self._entries:  # Written by another process
+                self._entries[key] = len(data)
+                self._total += len(data)
+            self._entries.move_to_end(key)
+        return data
+
+    def put(self, key, data):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._total += len(data) - self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            self._evict()
+
+    def _evict(self):
+        while self._total > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._total -= size
+            self.evictions += 1
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
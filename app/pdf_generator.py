@@ -1,39 +1,391 @@
+import hashlib
+import io
 import os
-from weasyprint import HTML
+import re
+import threading
+from xml.sax.saxutils import escape
+from urllib.parse import unquote, urlparse
+from weasyprint import CSS, HTML
+from weasyprint.text.fonts import FontConfiguration
+from weasyprint.urls import URLFetcher, URLFetcherResponse
+from reportlab.lib.colors import HexColor
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+from reportlab.platypus import Paragraph
+from pypdf import PdfReader, PdfWriter
 from jinja2 import Environment, FileSystemLoader
 from datetime import datetime
+from .pdf_cache import PdfCache
 
-def build_pdf(output_path, month_year, first_name, letter_content, additional_data=None):
-    # Setup Jinja2 environment
-    template_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'templates')
-    env = Environment(loader=FileSystemLoader(template_dir))
-    template = env.get_template('lob_letter.html')
-    
-    # Prepare data for template
-    date_obj = datetime.strptime(month_year, "%Y-%m")
-    date_str = date_obj.strftime("%B %d, %Y")
-    
-    # Default data if additional_data is not provided
-    data = {
-        "date_str": date_str,
-        "first_name": first_name,
-        "letter_content": letter_content.replace('\n', '<br><br>'),
-        "bc": "??",
-        "planet": "Mercury",
-        "age": "??"
-    }
-    
-    if additional_data:
-        data.update({
-            "bc": additional_data.get("birth_card", "??"),
-            "planet": additional_data.get("period", {}).get("planet", "Mercury"),
-            "age": additional_data.get("age", "??")
-        })
-    
-    # Render HTML
-    html_content = template.render(**data)
-    
-    # Generate PDF
-    HTML(string=html_content, base_url=template_dir).write_pdf(output_path)
-    
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates')
+FONTS_DIR = os.path.join(TEMPLATE_DIR, 'fonts')
+
+ASSET_TYPES = {
+    '.css': 'text/css',
+    '.woff2': 'font/woff2',
+    '.woff': 'font/woff',
+    '.ttf': 'font/ttf',
+    '.otf': 'font/otf',
+}
+
+class LocalAssetFetcher(URLFetcher):
+    """
+    WeasyPrint URL fetcher that never touches the network.
+
+    Serves file:// URLs under the templates directory from an in-memory copy
+    (fonts are preloaded) and refuses every other URL.
+    """
+
+    def __init__(self, root=TEMPLATE_DIR, preload_dir=FONTS_DIR):
+        super().__init__(allowed_protocols=('file',))
+        self.root = os.path.realpath(root)
+        self._assets = {}
+        self._lock = threading.Lock()
+        if os.path.isdir(preload_dir):
+            for name in os.listdir(preload_dir):
+                if os.path.splitext(name)[1] in ASSET_TYPES:
+                    self._load(os.path.realpath(os.path.join(preload_dir, name)))
+
+    def _load(self, path):
+        with open(path, 'rb') as f:
+            body = f.read()
+        with self._lock:
+            self._assets[path] = body
+        return body
+
+    def fetch(self, url, headers=None):
+        parsed = urlparse(url)
+        path = os.path.realpath(unquote(parsed.path))
+        if parsed.scheme != 'file' or not path.startswith(self.root + os.sep):
+            raise ValueError(f'Refusing to fetch {url}: only local template assets are allowed.')
+
+        body = self._assets.get(path)
+        if body is None:
+            body = self._load(path)
+        content_type = ASSET_TYPES.get(os.path.splitext(path)[1], 'application/octet-stream')
+        return URLFetcherResponse(url, body, {'Content-Type': content_type})
+
+class LetterRenderer:
+    """
+    Long-lived renderer for the Lob letter.
+
+    The Jinja template is compiled, the stylesheet parsed and the font
+    configuration created once; each render only does templating and layout.
+    Safe to share across threads: WeasyPrint layout is serialized on a lock.
+    Fonts come from templates/fonts via LocalAssetFetcher, never the network.
+    """
+
+    def __init__(self, template_dir=TEMPLATE_DIR, template_name='lob_letter.html', stylesheet_name='lob_letter.css',
+                 batch_template_name='lob_letter_batch.html'):
+        self.template_dir = template_dir
+        self.env = Environment(loader=FileSystemLoader(template_dir))
+        self.template = self.env.get_template(template_name)
+        self.batch_template = self.env.get_template(batch_template_name)
+        self.font_config = FontConfiguration()
+        self.url_fetcher = LocalAssetFetcher(template_dir)
+        self.stylesheets = [
+            CSS(filename=os.path.join(template_dir, name), font_config=self.font_config, url_fetcher=self.url_fetcher)
+            for name in ('fonts/fonts.css', stylesheet_name)
+        ]
+        self._lock = threading.Lock()
+
+        # Template version for cache keys: changes whenever the template, stylesheet or a font does
+        fonts_dir = os.path.join(template_dir, 'fonts')
+        font_files = sorted(os.path.join('fonts', name) for name in os.listdir(fonts_dir)
+                            if os.path.splitext(name)[1] in ASSET_TYPES) if os.path.isdir(fonts_dir) else []
+        digest = hashlib.sha256()
+        for name in (template_name, '_letter.html', stylesheet_name, *font_files):
+            digest.update(name.encode())
+            with open(os.path.join(template_dir, name), 'rb') as f:
+                digest.update(f.read())
+        self.version = digest.hexdigest()[:16]
+
+    @staticmethod
+    def template_data(month_year, first_name, letter_content, additional_data=None):
+        # Prepare data for template
+        date_obj = datetime.strptime(month_year, "%Y-%m")
+        date_str = date_obj.strftime("%B %d, %Y")
+
+        # Default data if additional_data is not provided
+        data = {
+            "date_str": date_str,
+            "first_name": first_name,
+            "letter_content": letter_content.replace('\n', '<br><br>'),
+            "bc": "??",
+            "planet": "Mercury",
+            "age": "??"
+        }
+
+        if additional_data:
+            data.update({
+                "bc": additional_data.get("birth_card", "??"),
+                "planet": additional_data.get("period", {}).get("planet", "Mercury"),
+                "age": additional_data.get("age", "??")
+            })
+        return data
+
+    def render_html(self, month_year, first_name, letter_content, additional_data=None):
+        return self.template.render(**self.template_data(month_year, first_name, letter_content, additional_data))
+
+    def render_bytes(self, month_year, first_name, letter_content, additional_data=None):
+        """Renders one letter and returns the PDF as bytes."""
+        return self.render_data_bytes(self.template_data(month_year, first_name, letter_content, additional_data))
+
+    def render_data_bytes(self, data):
+        """Renders prepared template data (see template_data) to PDF bytes."""
+        html_content = self.template.render(**data)
+        with self._lock:
+            return HTML(string=html_content, base_url=self.template_dir, url_fetcher=self.url_fetcher).write_pdf(
+                stylesheets=self.stylesheets, font_config=self.font_config)
+
+    def render_batch_bytes(self, batch, labels=None):
+        """Lays out several letters (prepared template data) as the pages of one PDF.
+
+        One layout pass and one embedded font subset for the whole batch; page i
+        is letter i and carries a bookmark labelled labels[i] (default: first name).
+        """
+        labels = labels or [data["first_name"] for data in batch]
+        html_content = self.batch_template.render(letters=list(zip(batch, labels)))
+        with self._lock:
+            document = HTML(string=html_content, base_url=self.template_dir, url_fetcher=self.url_fetcher).render(
+                stylesheets=self.stylesheets, font_config=self.font_config)
+            if len(document.pages) != len(batch):
+                raise ValueError(f"Batch of {len(batch)} letters laid out as {len(document.pages)} pages.")
+            return document.write_pdf()
+
+class ReportLabLetterRenderer:
+    """
+    Fast backend: draws the one-page lob_letter layout directly with ReportLab.
+
+    Mirrors lob_letter.html/.css (branding, suit marks, date line, salutation,
+    body, confidential footer); LetterRenderer (WeasyPrint) stays the fidelity
+    reference. Uses the TTF brand fonts in templates/fonts (ReportLab cannot
+    read WOFF2), else the closest PDF base fonts. Stateless per render, so
+    safe across threads.
+    """
+
+    LAYOUT_VERSION = "reportlab-1"
+    SUIT_FONT = "ZapfDingbats"  # Base fonts have no card suit glyphs
+    SUITS = "♠♥♣♦"
+
+    # CSS px -> pt
+    PX = 0.75
+
+    def __init__(self, fonts_dir=FONTS_DIR):
+        self.fonts = {
+            "serif": self._register(fonts_dir, "CrimsonPro-Regular", "Times-Roman"),
+            "serif-semibold": self._register(fonts_dir, "CrimsonPro-SemiBold", "Times-Bold"),
+            "serif-italic": self._register(fonts_dir, "CrimsonPro-Italic", "Times-Italic"),
+            "sans": self._register(fonts_dir, "Inter-Regular", "Helvetica"),
+        }
+        self.body_style = ParagraphStyle(
+            "letter-body", fontName=self.fonts["serif"], fontSize=12.5, leading=12.5 * 1.8,
+            textColor=HexColor("#2c2c2c"), spaceAfter=12.5 * 1.8,
+        )
+        digest = hashlib.sha256()  # Cached PDFs go stale when a brand font file changes too
+        for name in sorted(set(self.fonts.values())):
+            path = os.path.join(fonts_dir, f"{name}.ttf")
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    digest.update(f.read())
+        self.version = f"{self.LAYOUT_VERSION}-" + "-".join(sorted(set(self.fonts.values()))) + f"-{digest.hexdigest()[:8]}"
+
+    @staticmethod
+    def _register(fonts_dir, name, fallback):
+        path = os.path.join(fonts_dir, f"{name}.ttf")
+        if not os.path.exists(path):
+            return fallback
+        if name not in pdfmetrics.getRegisteredFontNames():
+            pdfmetrics.registerFont(TTFont(name, path))
+        return name
+
+    def _runs(self, text, font):
+        """Splits text into (font, run) pieces so card suits come from the suit font."""
+        runs = []
+        for ch in text:
+            ch_font = self.SUIT_FONT if ch in self.SUITS else font
+            if runs and runs[-1][0] == ch_font:
+                runs[-1][1] += ch
+            else:
+                runs.append([ch_font, ch])
+        return runs
+
+    def _draw_text(self, c, x, y, text, font, size, color, char_space=0, align="left"):
+        """Draws one line of text, left- or right-aligned at x."""
+        runs = self._runs(text, font)
+        widths = [pdfmetrics.stringWidth(run, run_font, size) + char_space * len(run) for run_font, run in runs]
+        if align == "right":
+            x -= sum(widths)
+        c.setFillColor(HexColor(color))
+        for (run_font, run), run_width in zip(runs, widths):
+            c.setFont(run_font, size)
+            c.drawString(x, y, run, charSpace=char_space)
+            x += run_width
+
+    def render_data_bytes(self, data):
+        """Renders prepared template data (see LetterRenderer.template_data) to PDF bytes."""
+        buf = io.BytesIO()
+        c = canvas.Canvas(buf, pagesize=letter, pageCompression=1)
+        self._draw_letter(c, data)
+        c.save()
+        return buf.getvalue()
+
+    def render_batch_bytes(self, batch, labels=None):
+        """Draws several letters as the pages of one PDF, bookmarked like LetterRenderer.render_batch_bytes."""
+        labels = labels or [data["first_name"] for data in batch]
+        buf = io.BytesIO()
+        c = canvas.Canvas(buf, pagesize=letter, pageCompression=1)
+        for i, (data, label) in enumerate(zip(batch, labels)):
+            c.bookmarkPage(f"letter-{i}")
+            c.addOutlineEntry(str(label), f"letter-{i}", level=0)
+            self._draw_letter(c, data)
+        c.save()
+        return buf.getvalue()
+
+    def _draw_letter(self, c, data):
+        width, height = letter
+        px = self.PX
+        left, right = 0.75 * inch, width - 0.75 * inch
+
+        # Branding (top right, with a rule on its right edge)
+        top = height - 0.6 * inch
+        text_right = right - 2 * px - 15 * px
+        self._draw_text(c, text_right, top - 19.8, "THE ANALOG ALGORITHM", self.fonts["serif-semibold"], 18,
+                        "#1a1a1a", char_space=0.05 * 18, align="right")
+        self._draw_text(c, text_right, top - 40.6, "SOLAR PERMUTATION ENGINE", self.fonts["sans"], 8,
+                        "#666666", char_space=0.2 * 8, align="right")
+        c.setStrokeColor(HexColor("#1a1a1a"))
+        c.setLineWidth(2 * px)
+        c.line(right - px, top, right - px, top - 44.6)
+
+        # Suit marks
+        self._draw_text(c, left, height - 3.2 * inch - 11.2, "♠ ♥ ♣ ♦", self.fonts["sans"], 10, "#dddddd",
+                        char_space=5)
+
+        # Content area: date line, salutation, body
+        y = height - 3.75 * inch
+        self._draw_text(c, left, y - 9.9, data["date_str"], self.fonts["sans"], 9, "#888888", char_space=0.05 * 9)
+        y -= 9 * 1.6 + 30 * px
+        self._draw_text(c, left, y - 17.6, f"Dear {data['first_name']},", self.fonts["serif"], 16, "#1a1a1a")
+        y -= 16 * 1.6 + 25 * px
+        for text in data["letter_content"].split("<br><br>"):
+            para = Paragraph(escape(text.strip()), self.body_style)
+            _, para_height = para.wrapOn(c, right - left, height)
+            para.drawOn(c, left, y - para_height)
+            y -= para_height + self.body_style.spaceAfter
+
+        # Footer
+        bottom = 0.75 * inch
+        c.setStrokeColor(HexColor("#eeeeee"))
+        c.setLineWidth(0.5)
+        c.line(left, bottom + 45.45, right, bottom + 45.45)
+        footer = f"Confidential • {data['bc']} • {data['planet']} Period • Age {data['age']}"
+        self._draw_text(c, left, bottom + 4.25, footer, self.fonts["sans"], 8.5, "#999999")
+        self._draw_text(c, right, bottom + 21, "-- The Analog Algorithm", self.fonts["serif-italic"], 12,
+                        "#1a1a1a", align="right")
+        self._draw_text(c, right, bottom + 3.75, "ANALOGALGO.COM", self.fonts["sans"], 7.5, "#bbbbbb",
+                        char_space=0.1 * 7.5, align="right")
+
+        c.showPage()
+
+BACKENDS = {
+    "weasyprint": LetterRenderer,
+    "reportlab": ReportLabLetterRenderer,
+}
+
+_renderers = {}
+_renderer_lock = threading.Lock()
+
+def get_renderer(backend=None):
+    """Returns the process-wide renderer for a backend (default: PDF_BACKEND, else weasyprint)."""
+    backend = backend or os.getenv("PDF_BACKEND", "weasyprint")
+    renderer = _renderers.get(backend)
+    if renderer is None:
+        with _renderer_lock:
+            renderer = _renderers.get(backend)
+            if renderer is None:
+                renderer = _renderers[backend] = BACKENDS[backend]()
+    return renderer
+
+_pdf_cache = None
+_pdf_cache_lock = threading.Lock()
+
+def get_pdf_cache():
+    """Returns the process-wide PdfCache, or None unless PDF_CACHE_DIR is set."""
+    global _pdf_cache
+    cache_dir = os.getenv("PDF_CACHE_DIR")
+    if not cache_dir:
+        return None
+    if _pdf_cache is None:
+        with _pdf_cache_lock:
+            if _pdf_cache is None:
+                max_mb = int(os.getenv("PDF_CACHE_MAX_MB", "512"))
+                _pdf_cache = PdfCache(cache_dir, max_bytes=max_mb * 1024 * 1024)
+    return _pdf_cache
+
+def filename_slug(name, default="subscriber"):
+    """ASCII file-name fragment for a subscriber's name ("Mary Ann" -> "mary-ann")."""
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-") or default
+
+def render_pdf(month_year, first_name, letter_content, additional_data=None, output_path=None, backend=None):
+    """Renders a letter in memory and returns the PDF bytes; also writes them to output_path when given.
+
+    Identical renders (same template version and inputs) are served from the PDF cache when enabled.
+    """
+    renderer = get_renderer(backend)
+    data = LetterRenderer.template_data(month_year, first_name, letter_content, additional_data)
+    cache = get_pdf_cache()
+    if cache is None:
+        pdf_bytes = renderer.render_data_bytes(data)
+    else:
+        key = PdfCache.key(renderer.version, data)
+        pdf_bytes = cache.get(key)
+        if pdf_bytes is None:
+            pdf_bytes = renderer.render_data_bytes(data)
+            cache.put(key, pdf_bytes)
+    if output_path:
+        with open(output_path, 'wb') as f:
+            f.write(pdf_bytes)
+    return pdf_bytes
+
+def iter_letter_batches(letters, batch_size=None, backend=None):
+    """Renders letters in print batches of one multi-page PDF each.
+
+    letters is an iterable of (month_year, first_name, letter_content, additional_data)
+    tuples, consumed lazily. Yields (letters_in_batch, pdf_bytes); page i of each PDF is
+    letter i of its batch. batch_size defaults to PRINT_BATCH_SIZE (100).
+    """
+    batch_size = batch_size or int(os.getenv("PRINT_BATCH_SIZE", "100"))
+    renderer = get_renderer(backend)
+    batch = []
+    for item in letters:
+        batch.append(item)
+        if len(batch) == batch_size:
+            yield batch, _render_batch(renderer, batch)
+            batch = []
+    if batch:
+        yield batch, _render_batch(renderer, batch)
+
+def _render_batch(renderer, batch):
+    datas = [LetterRenderer.template_data(*item) for item in batch]
+    return renderer.render_batch_bytes(datas)
+
+def split_pdf_pages(pdf_bytes):
+    """Splits a batch PDF into one PDF (bytes) per page, i.e. per letter."""
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    pages = []
+    for page in reader.pages:
+        writer = PdfWriter()
+        writer.add_page(page)
+        buf = io.BytesIO()
+        writer.write(buf)
+        pages.append(buf.getvalue())
+    return pages
+
+def build_pdf(output_path, month_year, first_name, letter_content, additional_data=None, backend=None):
+    render_pdf(month_year, first_name, letter_content, additional_data, output_path=output_path, backend=backend)
     return output_path
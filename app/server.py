@@ -1,17 +1,59 @@
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
+from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import contextlib
 import datetime
+import io
+import json
 import logging
 import os
-from . import engine, integrations, pdf_generator
+import uuid
+from urllib.parse import quote
+from . import engine, integrations, jobs, lob_bulk, pdf_generator, webhooks
 
-app = FastAPI(title="Analog Algorithm Engine", version="1.1.0")
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    global job_queue, job_workers
+    if job_queue is None:
+        job_queue = jobs.JobQueue(os.getenv("JOBS_DB", "jobs.db"),
+                                  lease_seconds=int(os.getenv("JOB_LEASE_SECONDS", "300")))
+    job_workers = jobs.JobWorkers(job_queue, JOB_HANDLERS, concurrency=int(os.getenv("JOB_WORKERS", "2")),
+                                  backoff=float(os.getenv("JOB_RETRY_BACKOFF", "2")))
+    job_workers.start()
+    try:
+        yield
+    finally:
+        job_workers.stop(timeout=30)
+        job_queue.close()
+        render_executor.shutdown(wait=False, cancel_futures=True)
+        await integrations.close_async_client()
+
+app = FastAPI(title="Analog Algorithm Engine", version="1.1.0", lifespan=lifespan)
+app.mount("/fonts", StaticFiles(directory=pdf_generator.FONTS_DIR), name="fonts")
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Fill the engine's reading cache at startup (~32k readings) unless disabled.
+if os.getenv("MATERIALIZE_READINGS", "1") == "1":
+    engine.READING_CACHE.materialize()
+
+# Compile the letter template, parse its stylesheet and set up fonts once.
+pdf_generator.get_renderer()
+
+# Engine + PDF rendering is blocking; it runs here, never on the event loop.
+# Bounded so a burst of letters queues instead of starving the process.
+render_executor = ThreadPoolExecutor(max_workers=int(os.getenv("RENDER_WORKERS", "2")), thread_name_prefix="render")
+
+# Letters are produced by background workers from a durable SQLite queue,
+# opened at startup so importing this module touches no files.
+job_queue = None
+job_workers = None
+
 class LetterRequest(BaseModel):
     first_name: str
     birth_date: str
@@ -24,7 +66,7 @@ DASHBOARD_HTML = """
 <head>
     <meta charset="UTF-8">
     <title>Analog Algorithm | Writer's Dashboard</title>
-    <link href="https://fonts.googleapis.com/css2?family=Crimson+Pro:wght@400;600&family=Inter:wght@300;400;600&display=swap" rel="stylesheet">
+    <link href="/fonts/fonts.css" rel="stylesheet">
     <style>
         :root { --paper: #f9f7f2; --ink: #2c2c2c; --accent: #8b7d6b; }
         body { font-family: 'Inter', sans-serif; background-color: #f0f0f0; color: var(--ink); margin: 0; display: flex; justify-content: center; align-items: center; min-height: 100vh; }
@@ -72,13 +114,23 @@ DASHBOARD_HTML = """
                         target_month: document.getElementById('targetMonth').value
                     })
                 });
-                const data = await response.json();
-                if (response.ok) {
+                let data = await response.json();
+                if (!response.ok) {
+                    resDiv.className = 'error';
+                    resDiv.innerText = "Error: " + data.detail;
+                    return;
+                }
+                resDiv.innerHTML = 'Letter queued, rendering...';
+                while (data.state !== 'succeeded' && data.state !== 'failed') {
+                    await new Promise(resolve => setTimeout(resolve, 1000));
+                    data = await (await fetch(`/jobs/${data.job_id}`)).json();
+                }
+                if (data.state === 'succeeded') {
                     resDiv.className = 'success';
-                    resDiv.innerHTML = `Success! Card: ${data.engine_data.birth_card}. Mailed via Lob.`;
+                    resDiv.innerHTML = `Success! Card: ${data.result.engine_data.birth_card}. Mailed via Lob.`;
                 } else {
                     resDiv.className = 'error';
-                    resDiv.innerText = "Error: " + data.detail;
+                    resDiv.innerText = "Error: " + data.error;
                 }
             } catch (err) { resDiv.innerText = "Error: " + err.message; }
         }
@@ -95,20 +147,38 @@ async def dashboard():
 async def health():
     return {"status": "alive"}
 
-@app.post("/admin/generate-test")
-async def generate_test_letter(req: LetterRequest):
-    try:
-        b_year, b_month, b_day = map(int, req.birth_date.split("-"))
-        target_date = f"{req.target_month}-15"
-        data = engine.calculate_letter_data(req.first_name, b_year, b_month, b_day, target_date)
-        
-        # Generate Professional Prose
-        period_card = data['period']['card']
-        planet = data['period']['planet']
-        archetype = engine.get_rank_archetype(period_card)
-        realm = engine.get_suit_realm(period_card)
-        
-        prose = f"""You're already doing that thing again.
+@app.get("/admin/engine-cache")
+async def engine_cache_stats():
+    return engine.READING_CACHE.stats()
+
+def letter_output_path(first_name):
+    """Optional on-disk copy of a rendered letter (set LETTER_OUTPUT_DIR to enable)."""
+    output_dir = os.getenv("LETTER_OUTPUT_DIR")
+    if not output_dir:
+        return None
+    return os.path.join(output_dir, f"manual_{pdf_generator.filename_slug(first_name)}_{uuid.uuid4().hex}.pdf")
+
+@app.get("/admin/pdf-cache")
+async def pdf_cache_stats():
+    cache = pdf_generator.get_pdf_cache()
+    return cache.stats() if cache else {"enabled": False}
+
+def build_letter(req: LetterRequest):
+    """Engine reading + prose + PDF for one request (blocking; runs on render_executor)."""
+    b_year, b_month, b_day = map(int, req.birth_date.split("-"))
+    target_date = f"{req.target_month}-15"
+    data = engine.calculate_letter_data(req.first_name, b_year, b_month, b_day, target_date)
+    
+    if "error" in data:
+        raise ValueError(data["error"])
+    
+    # Generate Professional Prose
+    period_card = data.period_card
+    planet = data.planet
+    archetype = engine.get_rank_archetype(period_card)
+    realm = engine.get_suit_realm(period_card)
+    
+    prose = f"""You're already doing that thing again.
 
 The pattern running right now is the {archetype} in the {realm.lower()} domain, activated through {planet.lower()} perception.
 
@@ -117,19 +187,135 @@ The uncomfortable line: this is costing you more than you're admitting.
 The question that lingers: what would a single day look like if you measured it by what you kept instead of what you shipped?
 
 This cycle isn't about productivity; it's about structural integrity. The friction you feel is the algorithm attempting to correct for a variable you've been trying to ignore. Pay attention to what breaks when you stop pushing."""
-        
-        filename = f"manual_{req.first_name}.pdf"
-        pdf_path = os.path.join(os.getcwd(), filename)
-        pdf_generator.build_pdf(pdf_path, req.target_month, req.first_name, prose, additional_data=data)
+    
+    pdf_bytes = pdf_generator.render_pdf(req.target_month, req.first_name, prose, additional_data=data,
+                                         output_path=letter_output_path(req.first_name))
+    return data, pdf_bytes
+
+def mail_letter(req: LetterRequest, addr: dict, idempotency_key=None):
+    """Renders a letter and mails it via Lob (job worker side). Lob failures raise so the job is retried."""
+    check = integrations.verify_address(addr)
+    if check["deliverable"] is False:  # Do not pay for a letter that cannot arrive
+        raise jobs.JobFailed(f"Undeliverable address ({check['deliverability']}).")
+    addr = check["address"]
+    try:
+        data, pdf_bytes = build_letter(req)
+    except ValueError as e:  # Bad birth date or a Joker: retrying will not help
+        raise jobs.JobFailed(str(e))
+
+    lob = integrations.send_letter_via_lob(pdf_bytes, addr, idempotency_key=idempotency_key)
+    if lob.get("status") == "failed":
+        raise RuntimeError("Lob rejected or did not accept the letter.")
+    return {"engine_data": data.to_dict(), "lob": lob}
+
+def run_letter_job(payload):
+    """Job handler for "letter" (dashboard test letters)."""
+    req = LetterRequest(**payload)
+    addr = {"name": req.first_name, "address_line1": "123 Test St", "city": "Portland", "state": "OR", "zip_code": "97204"}
+    # Same key on every retry of this job: a Lob call that succeeded but timed out is not mailed twice
+    key = lob_bulk.letter_idempotency_key(f"letter:{req.first_name}:{req.birth_date}", req.target_month)
+    return mail_letter(req, addr, idempotency_key=key)
+
+def run_tiktok_order_job(payload):
+    """Job handler for "tiktok_order": fetch the order, then render and mail its letter."""
+    order = integrations.fetch_tiktok_order(payload["order_id"])  # TikTokError: retried
+    if order is None:  # A new order may not be queryable yet
+        raise RuntimeError(f"TikTok did not return order {payload['order_id']}.")
+    if order.get("status") not in integrations.TIKTOK_PAID_STATUSES:  # Cancelled or refunded since the event
+        raise jobs.JobFailed(f"Order {order['order_id']} is {order.get('status') or 'of unknown status'}, not paid.")
+    customer = order["customer"]
+    if not customer.get("birth_date"):  # No reading without a real birth date
+        raise jobs.JobFailed(f"Order {order['order_id']} has no birth date.")
+    req = LetterRequest(first_name=customer["first_name"], birth_date=customer["birth_date"],
+                        target_month=payload["target_month"])
+    # Same key on every retry of this order's job: Lob mails it at most once
+    key = lob_bulk.letter_idempotency_key(f"tiktok:{order['order_id']}", req.target_month)
+    return {"order_id": order["order_id"], **mail_letter(req, order["shipping_address"], idempotency_key=key)}
+
+JOB_HANDLERS = {"letter": run_letter_job, "tiktok_order": run_tiktok_order_job}
+
+def job_status(job):
+    return {
+        "job_id": job["id"],
+        "kind": job["kind"],
+        "state": job["state"],
+        "attempts": job["attempts"],
+        "max_attempts": job["max_attempts"],
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+        "next_attempt_at": job["run_after"] if job["state"] == "queued" else None,
+        "result": job.get("result"),
+        "error": job["error"],
+    }
+
+@app.post("/admin/generate-test")
+async def generate_test_letter(req: LetterRequest, download: bool = False):
+    if not download:
+        job_id = job_queue.enqueue("letter", req.model_dump(), max_attempts=int(os.getenv("JOB_MAX_ATTEMPTS", "5")))
+        return JSONResponse(status_code=202, content={"job_id": job_id, "state": "queued", "status_url": f"/jobs/{job_id}"})
+
+    # Manual preview: render and mail now, and stream the PDF back
+    try:
+        loop = asyncio.get_running_loop()
+        data, pdf_bytes = await loop.run_in_executor(render_executor, build_letter, req)
         
         addr = {"name": req.first_name, "address_line1": "123 Test St", "city": "Portland", "state": "OR", "zip_code": "97204"}
-        integrations.send_letter_via_lob(pdf_path, addr)
+        await integrations.send_letter_via_lob_async(pdf_bytes, addr)
         
-        return {"message": "Success", "engine_data": data}
+        # Headers are Latin-1: an ASCII filename, plus the real name per RFC 5987 for clients that read it
+        disposition = (f'inline; filename="manual_{pdf_generator.filename_slug(req.first_name)}.pdf"; '
+                       f"filename*=UTF-8''{quote(f'manual_{req.first_name}.pdf', safe='')}")
+        return StreamingResponse(io.BytesIO(pdf_bytes), media_type="application/pdf",
+                                 headers={"Content-Disposition": disposition})
     except Exception as e:
         logger.error(f"Error generating test letter: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# TikTok redelivers events it thinks were missed; recently seen order ids are dropped.
+recent_orders = webhooks.RecentIds(int(os.getenv("WEBHOOK_DEDUP_SIZE", "10000")))
+
+@app.post("/webhook/tiktok")
+async def tiktok_webhook(request: Request):
+    """Verifies, de-duplicates and queues paid-order events; fulfilment happens on the job workers."""
+    body = await request.body()
+    signature = request.headers.get("Authorization", "")
+    if not webhooks.verify_tiktok_signature(os.getenv("TIKTOK_APP_KEY", ""), os.getenv("TIKTOK_APP_SECRET", ""),
+                                            body, signature):
+        raise HTTPException(status_code=401, detail="Invalid signature")
+
+    try:
+        event = json.loads(body)
+        order_id = str(event["data"]["order_id"])
+        order_status = event["data"].get("order_status")
+        event_type = event.get("type")
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return {"status": "ignored"}  # Not an order event
+    # Unpaid, cancelled, return and address events are acknowledged but never fulfilled (or de-duplicated)
+    if event_type != webhooks.TIKTOK_ORDER_STATUS_CHANGE or order_status not in integrations.TIKTOK_PAID_STATUSES:
+        return {"status": "ignored", "order_id": order_id}
+
+    if not recent_orders.add(order_id):
+        return {"status": "duplicate", "order_id": order_id}
+    try:
+        job_id = job_queue.enqueue("tiktok_order", {"order_id": order_id,
+                                                    "target_month": datetime.date.today().strftime("%Y-%m")})
+    except Exception:
+        recent_orders.discard(order_id)  # Let TikTok's redelivery try again
+        raise
+    integrations.tiktok_orders().submit(order_id)  # Prefetch: a burst of orders shares one detail query
+    return {"status": "accepted", "order_id": order_id, "job_id": job_id}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_status(job)
+
+@app.get("/admin/jobs")
+async def job_counts():
+    return job_queue.counts()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=int(os.getenv("PORT", 8000)))
@@ -0,0 +1,48 @@
+import collections
+import hashlib
+import hmac
+import threading
+
+TIKTOK_ORDER_STATUS_CHANGE = 1  # Webhook event type for order status updates
+
+def tiktok_signature(app_key: str, app_secret: str, body: bytes):
+    """TikTok Shop webhook signature: hex HMAC-SHA256 of app_key + raw body, keyed with the app secret."""
+    return hmac.new(app_secret.encode(), app_key.encode() + body, hashlib.sha256).hexdigest()
+
+def verify_tiktok_signature(app_key: str, app_secret: str, body: bytes, signature: str):
+    if not app_secret or not signature:
+        return False
+    return hmac.compare_digest(tiktok_signature(app_key or "", app_secret, body), signature)
+
+class RecentIds:
+    """
+    Bounded set of recently seen ids for dropping redelivered webhook events.
+
+    Keeps the last max_size ids (oldest forgotten first); add() is atomic, so
+    concurrent redeliveries of one id are accepted exactly once.
+    """
+
+    def __init__(self, max_size=10_000):
+        self.max_size = max_size
+        self._ids = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.duplicates = 0
+
+    def add(self, item_id):
+        """Records item_id; returns False if it was already seen."""
+        with self._lock:
+            if item_id in self._ids:
+                self._ids.move_to_end(item_id)
+                self.duplicates += 1
+                return False
+            self._ids[item_id] = None
+            if len(self._ids) > self.max_size:
+                self._ids.popitem(last=False)
+            return True
+
+    def discard(self, item_id):
+        with self._lock:
+            self._ids.pop(item_id, None)
+
+    def __len__(self):
+        return len(self._ids)
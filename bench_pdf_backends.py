@@ -0,0 +1,44 @@
+import argparse
+import statistics
+import time
+from app.engine import calculate_letter_data
+from app.pdf_generator import LetterRenderer, get_renderer
+
+SAMPLE_LETTER = (
+    "This month the cards ask you to slow down and look at what you have already built.\n"
+    "Your period card sits in the Venus lens, so the work is relational: who you give your time to, "
+    "and what you expect back. Notice where you keep the score.\n"
+    "By the end of the period, write down one thing you are ready to stop carrying."
+)
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def bench(backend, data, runs, warmup):
+    """Times render_data_bytes for one backend; returns per-render milliseconds and the last PDF size."""
+    renderer = get_renderer(backend)
+    for _ in range(warmup):
+        renderer.render_data_bytes(data)
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        pdf = renderer.render_data_bytes(data)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples, len(pdf)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the Lob letter PDF backends side by side.")
+    parser.add_argument("--runs", type=int, default=100, help="Timed renders per backend")
+    parser.add_argument("--warmup", type=int, default=5, help="Untimed renders per backend")
+    parser.add_argument("--backends", nargs="+", default=["weasyprint", "reportlab"])
+    args = parser.parse_args()
+
+    letter = calculate_letter_data("Cassidy", 1991, 2, 17, "2026-03-15")
+    data = LetterRenderer.template_data("2026-03", "Cassidy", SAMPLE_LETTER, letter)
+
+    print(f"{'backend':<12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'mean ms':>10}{'bytes':>10}")
+    for backend in args.backends:
+        samples, size = bench(backend, data, args.runs, args.warmup)
+        print(f"{backend:<12}{percentile(samples, 50):>10.2f}{percentile(samples, 95):>10.2f}"
+              f"{percentile(samples, 99):>10.2f}{max(samples):>10.2f}{statistics.mean(samples):>10.2f}{size:>10}")
@@ -1,12 +1,18 @@
+import argparse
+import io
 import os
 import subprocess
-from generate_calendar_html import generate_html_planner
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pypdf import PdfWriter
+from weasyprint import HTML
+from app.pdf_generator import LocalAssetFetcher
+from generate_calendar_html import generate_html_planner, render_html_planner, TEMPLATE_DIR
 
 def export_to_print(first_name, birth_year, birth_month, birth_day, target_year=2026):
     print(f"1. Calculating 364-day Analog Matrix for {first_name}...")
-    generate_html_planner(first_name, birth_year, birth_month, birth_day, target_year)
+    html_file = generate_html_planner(first_name, birth_year, birth_month, birth_day, target_year)
     
-    html_file = "planner_prototype.html"
     pdf_file = f"Analog_Planner_{first_name}_{target_year}.pdf"
     
     print("2. Firing formatting engine and printing to physical PDF layout...")
@@ -16,5 +22,57 @@ def export_to_print(first_name, birth_year, birth_month, birth_day, target_year=
     
     print(f"3. SUCCESS! Your master print file is ready at: {pdf_file}")
 
+_fetcher = None
+
+def _render_chunk(job):
+    """Renders one page range of the planner to PDF bytes (runs in a worker process)."""
+    global _fetcher
+    if _fetcher is None:  # One per worker process: fonts are read from disk once
+        _fetcher = LocalAssetFetcher()
+    index, first_day, days, subscriber = job
+    started = time.perf_counter()
+    html = io.StringIO()
+    render_html_planner(html, *subscriber, days=days, first_day=first_day)
+    pdf = HTML(string=html.getvalue(), base_url=TEMPLATE_DIR, url_fetcher=_fetcher).write_pdf()
+    return index, first_day, days, pdf, time.perf_counter() - started
+
+def export_to_print_parallel(first_name, birth_year, birth_month, birth_day, target_year=2026,
+                             chunk_days=28, workers=None, total_days=364):
+    """Renders the planner in page-range chunks across a process pool and merges them into one PDF."""
+    pdf_file = f"Analog_Planner_{first_name}_{target_year}.pdf"
+    subscriber = (first_name, birth_year, birth_month, birth_day, target_year)
+    jobs = [(index, first_day, min(chunk_days, total_days - first_day), subscriber)
+            for index, first_day in enumerate(range(0, total_days, chunk_days))]
+    workers = workers or os.cpu_count()
+
+    print(f"1. Rendering {total_days} pages for {first_name} in {len(jobs)} chunks across {workers} processes...")
+    started = time.perf_counter()
+    chunks = [None] * len(jobs)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_render_chunk, job) for job in jobs]
+        for done, future in enumerate(as_completed(futures), 1):
+            index, first_day, days, pdf, seconds = future.result()
+            chunks[index] = pdf
+            print(f"   [{done}/{len(jobs)}] days {first_day + 1}-{first_day + days} rendered in {seconds:.2f}s")
+
+    print("2. Merging chunks into the master print file...")
+    writer = PdfWriter()
+    for pdf in chunks:
+        writer.append(io.BytesIO(pdf))
+    with open(pdf_file, "wb") as f:
+        writer.write(f)
+
+    print(f"3. SUCCESS! Your master print file is ready at: {pdf_file} ({time.perf_counter() - started:.1f}s)")
+    return pdf_file
+
 if __name__ == "__main__":
-    export_to_print("Cassidy", 1991, 2, 17, 2026)
+    parser = argparse.ArgumentParser(description="Export the Analog planner to a print-ready PDF.")
+    parser.add_argument("--parallel", action="store_true", help="Render page chunks with WeasyPrint in a process pool")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunk-days", type=int, default=28, help="Pages per chunk")
+    args = parser.parse_args()
+
+    if args.parallel:
+        export_to_print_parallel("Cassidy", 1991, 2, 17, 2026, chunk_days=args.chunk_days, workers=args.workers)
+    else:
+        export_to_print("Cassidy", 1991, 2, 17, 2026)
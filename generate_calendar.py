@@ -1,21 +1,62 @@
+import calendar
 import datetime
+import functools
 import math
-from app.engine import get_birth_card, get_spread_year, generate_yearly_spread_data, extract_chain, ROWS
+from app.engine import get_birth_card, get_birth_card_id, full_chain, locate, ROWS, CROWN_ROW, SPREAD_SLOTS
 
-def get_card_location(card, grid, crown):
-    """Finds where a specific card is located in a given spread."""
-    for ri, rn in enumerate(ROWS):
-        if card in grid[rn]:
-            return {"type": "grid", "row": rn, "col_idx": grid[rn].index(card)}
-    
-    if card in crown:
-        return {"type": "crown", "idx": crown.index(card)}
-        
-    return {"type": "unknown"}
+def get_card_location(card, spread_year):
+    """Finds where a specific card is located in a given spread year."""
+    position = locate(card, spread_year)
+    if position is None:
+        return {"type": "unknown"}
+
+    ri, ci = position
+    if ri == CROWN_ROW:
+        return {"type": "crown", "idx": ci}
+    return {"type": "grid", "row": ROWS[ri], "col_idx": ci}
+
+# ====================== PRECOMPUTED TABLES ======================
+
+def _leap_year_days():
+    """(month, day) for every day of a leap year, in calendar order."""
+    day = datetime.date(2000, 1, 1)
+    days = []
+    while day.year == 2000:
+        days.append((day.month, day.day))
+        day += datetime.timedelta(days=1)
+    return tuple(days)
+
+LEAP_YEAR_DAYS = _leap_year_days()
+FEB_29 = LEAP_YEAR_DAYS.index((2, 29))
+JOKER_KEY = 52  # Column of the collision tables for the Joker (Dec 31)
+
+# Global card (and its collision-table column) for each of the 366 days.
+GLOBAL_CARDS = tuple(get_birth_card(m, d)[0] for m, d in LEAP_YEAR_DAYS)
+GLOBAL_CARD_KEYS = tuple(JOKER_KEY if card_id is None else card_id
+                         for card_id in (get_birth_card_id(m, d) for m, d in LEAP_YEAR_DAYS))
+
+# (spread_year x global card) -> line of the user's spread the global card lands in.
+UNANCHORED = 'Crown / Unanchored'
+COLLISION_PLANETS = tuple(
+    tuple(ROWS[slot // 7] if slot < 49 else UNANCHORED for slot in slots) + (UNANCHORED,)
+    for slots in SPREAD_SLOTS
+)
+
+@functools.lru_cache(maxsize=16)
+def _calendar_days(year):
+    """(date string, global card, collision column) for every day of `year` and `year + 1`."""
+    days = []
+    for y in (year, year + 1):
+        leap = calendar.isleap(y)
+        for i, (m, d) in enumerate(LEAP_YEAR_DAYS):
+            if i == FEB_29 and not leap:
+                continue
+            days.append((f"{y}-{m:02d}-{d:02d}", GLOBAL_CARDS[i], GLOBAL_CARD_KEYS[i]))
+    return tuple(days)
 
 def generate_daily_calendar(first_name, birth_year, birth_month, birth_day, target_year=2026):
     """
-    Generates a 364-day calendar starting from the user's birthday in the target_year.
+    Yields a 364-day calendar starting from the user's birthday in the target_year.
     Combines:
     1. The Planetary Period (Mercury, Venus, etc.)
     2. The Fractal Walk Card (Card 1-52 of their spread cycle)
@@ -26,53 +67,34 @@ def generate_daily_calendar(first_name, birth_year, birth_month, birth_day, targ
     
     # Set the start date to their birthday in the target year
     start_date = datetime.date(target_year, birth_month, birth_day)
+    start = start_date.timetuple().tm_yday - 1
     age = target_year - birth_year
     spread_year = min(max(age + 1, 1), 90)
     
-    # 2. Extract their specific yearly grid and a full 52-card chain
-    yearly_grid, yearly_crown = generate_yearly_spread_data(spread_year)
-    full_chain = extract_chain(yearly_grid, yearly_crown, user_birth_card, 52)
-    
-    calendar_data = []
+    # 2. Their full 52-card chain and collision row for the yearly spread
+    chain = full_chain(spread_year, user_birth_card)
+    collisions = COLLISION_PLANETS[spread_year]
     
     # 3. Walk through 364 days (7 periods x 52 days)
-    for day_offset in range(364):
-        current_date = start_date + datetime.timedelta(days=day_offset)
-        
-        # --- METHOD 1: The Fractal Walk ---
-        period_idx = day_offset // 52
-        planetary_period_name = ROWS[period_idx]
-        
-        # Day within the 52-day period (0-51)
-        fractal_day_idx = day_offset % 52
-        fractal_card = full_chain[fractal_day_idx]
-        
-        # --- METHOD 2: The Global Collision ---
-        # What is the global card for this exact calendar date?
-        global_card, _ = get_birth_card(current_date.month, current_date.day)
-        
-        # Where does this Global Card sit in the User's personal yearly spread?
-        global_card_location = get_card_location(global_card, yearly_grid, yearly_crown)
-        collision_planet = global_card_location.get('row', 'Crown / Unanchored')
-        
-        # Build the daily entry
-        day_data = {
-            "date": current_date.strftime("%Y-%m-%d"),
+    days = _calendar_days(target_year)[start:start + 364]
+    for day_offset, (date_str, global_card, global_key) in enumerate(days):
+        yield {
+            "date": date_str,
             "day_of_year": day_offset + 1,
-            "period": planetary_period_name,
-            "fractal_card": fractal_card,
+            # --- METHOD 1: The Fractal Walk ---
+            "period": ROWS[day_offset // 52],
+            "fractal_card": chain[day_offset % 52],
+            # --- METHOD 2: The Global Collision ---
+            # Where the global card for this calendar date sits in the User's personal yearly spread
             "global_card": global_card,
-            "collision_planet": collision_planet
+            "collision_planet": collisions[global_key]
         }
-        calendar_data.append(day_data)
-        
-    return calendar_data
 
 if __name__ == "__main__":
     import json
     # Test generation for a specific user
     print("Generating 364-day Analog Calendar Matrix...")
-    cal = generate_daily_calendar("Cassidy", 1991, 2, 17, target_year=2026)
+    cal = list(generate_daily_calendar("Cassidy", 1991, 2, 17, target_year=2026))
     
     with open("cassidy_2026_calendar.txt", "w", encoding="utf-8") as f:
         f.write("--- SAMPLE: FIRST 7 DAYS (MERCURY PERIOD) ---\n")
@@ -1,17 +1,11 @@
+import calendar
 import datetime
-from app.engine import get_birth_card, get_spread_year, generate_yearly_spread_data, extract_chain, ROWS
-
-def get_card_location(card, grid, crown):
-    """Finds where a specific card is located in a given spread."""
-    for ri, rn in enumerate(ROWS):
-        if card in grid[rn]:
-            return {"type": "grid", "row": rn, "col_idx": grid[rn].index(card)}
-    
-    if card in crown:
-        return {"type": "crown", "idx": crown.index(card)}
-        
-    return {"type": "unknown"}
-
+import itertools
+import os
+import pathlib
+from jinja2 import Environment, FileSystemLoader
+from app.engine import get_birth_card
+from generate_calendar import generate_daily_calendar
 
 # Procedural Language Dictionaries
 PERIOD_PREFIXES = {
@@ -111,238 +105,76 @@ def generate_sentence(period, fractal_card, collision_planet):
     return f"{p1} For your specific coordinates, {p2.lower()} {p3}"
 
 
-def generate_html_planner(first_name, birth_year, birth_month, birth_day, target_year=2026):
-    # Get base data
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+_env = Environment(loader=FileSystemLoader(TEMPLATE_DIR))
+# Absolute so the planner finds the vendored fonts wherever it is written
+FONTS_HREF = pathlib.Path(TEMPLATE_DIR, 'fonts', 'fonts.css').as_uri()
+
+# Black suits for the card glyph colour
+BLACK_SUITS = ('♠', '♣')
+
+def _planner_pages(days, start_date):
+    """Template context for each planner page, built lazily from the calendar's day records."""
+    start_weekday = start_date.weekday()
+    for day in days:
+        day_offset = day["day_of_year"] - 1
+        month, dom = int(day["date"][5:7]), day["date"][8:10]
+        period = day["period"]
+        fractal_card = day["fractal_card"]
+        global_card = day["global_card"]
+        collision_planet = day["collision_planet"]
+        yield {
+            "number": day["day_of_year"],
+            "header_date": f"{calendar.day_abbr[(start_weekday + day_offset) % 7]}, {calendar.month_abbr[month]} {dom}",
+            "period": period,
+            "fractal_card": fractal_card,
+            "f_color": "black" if fractal_card.endswith(BLACK_SUITS) else "",
+            "paragraph": generate_sentence(period, fractal_card, collision_planet),
+            "global_card": global_card,
+            "g_color": "black" if global_card.endswith(BLACK_SUITS) else "",
+            "collision_planet": collision_planet,
+            "collision_suffix": COLLISION_SUFFIXES.get(collision_planet, COLLISION_SUFFIXES['Crown / Unanchored']).lower(),
+        }
+
+def render_html_planner(fh, first_name, birth_year, birth_month, birth_day, target_year=2026, days=364,
+                        first_day=0):
+    """Streams the planner (CSS once, then one page per day) into an open text file handle.
+
+    `first_day` and `days` select a page range (0-based day offsets), so print
+    exports can render the book in chunks.
+    """
     user_birth_card, sv = get_birth_card(birth_month, birth_day)
     start_date = datetime.date(target_year, birth_month, birth_day)
     age = target_year - birth_year
     spread_year = min(max(age + 1, 1), 90)
-    
-    yearly_grid, yearly_crown = generate_yearly_spread_data(spread_year)
-    full_chain = extract_chain(yearly_grid, yearly_crown, user_birth_card, 52)
-    
-    # HTML Setup
-    html_content = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>The Analog Algorithm | {first_name}'s {target_year} Planner</title>
-    <link href="https://fonts.googleapis.com/css2?family=Crimson+Pro:wght@400;600;700&family=Inter:wght@400;700&family=JetBrains+Mono:wght@400;700&display=swap" rel="stylesheet">
-    <style>
-        :root {{
-            --paper: #F3F1ED; /* High-end beige paper */
-            --ink: #111111;
-            --accent: #B83B3B; /* Stark red for emphasis */
-            --page-width: 600px;
-        }}
-        body {{
-            font-family: 'Inter', sans-serif;
-            background-color: #E2DFD8; /* Slightly darker background outside the book */
-            color: var(--ink);
-            margin: 0;
-            padding: 40px;
-            display: flex;
-            flex-direction: column;
-            align-items: center;
-        }}
-        .book-page {{
-            background: var(--paper);
-            width: var(--page-width);
-            min-height: 800px;
-            padding: 50px 60px;
-            box-shadow: -15px 15px 30px rgba(0,0,0,0.1), inset 3px 0px 5px rgba(0,0,0,0.05); /* Page depth */
-            border-radius: 2px 5px 5px 2px;
-            border-left: 1px solid #d4d1cc; /* Book spine seam */
-            margin-bottom: 60px;
-            position: relative;
-        }}
-        
-        /* Typography */
-        h1.header {{
-            font-family: 'Crimson Pro', serif;
-            font-size: 2.2rem;
-            text-transform: uppercase;
-            font-weight: 700;
-            margin: 0;
-            letter-spacing: -1px;
-            border-bottom: 2px solid var(--ink);
-            padding-bottom: 10px;
-            display: flex;
-            justify-content: space-between;
-            align-items: baseline;
-        }}
-        h1.header span.date {{
-            font-family: 'JetBrains Mono', monospace;
-            font-size: 1rem;
-            font-weight: 400;
-            color: #555;
-            letter-spacing: 0;
-        }}
-        
-        .metadata-bar {{
-            display: flex;
-            justify-content: space-between;
-            font-family: 'JetBrains Mono', monospace;
-            font-size: 0.75rem;
-            text-transform: uppercase;
-            margin-top: 15px;
-            color: #555;
-            border-bottom: 1px dashed #ccc;
-            padding-bottom: 15px;
-            margin-bottom: 40px;
-        }}
-        
-        .metadata-bar div strong {{
-            color: var(--ink);
-        }}
-
-        .data-header {{
-            font-family: 'Crimson Pro', serif;
-            font-size: 1.2rem;
-            text-transform: uppercase;
-            font-weight: 700;
-            margin-top: 30px;
-            color: var(--ink);
-        }}
-
-        .reading-paragraph {{
-            font-size: 1.05rem;
-            line-height: 1.7;
-            text-align: justify;
-            margin-top: 10px;
-            color: #222;
-        }}
-
-        .collision-box {{
-            margin-top: 40px;
-            padding: 20px;
-            border: 1px solid var(--ink);
-            background-color: #ECE9E4;
-            position: relative;
-        }}
-        
-        .collision-box::before {{
-            content: "EXTERNAL COLLISION WARNING";
-            position: absolute;
-            top: -10px;
-            left: 15px;
-            background-color: #ECE9E4;
-            padding: 0 10px;
-            font-family: 'JetBrains Mono', monospace;
-            font-size: 0.65rem;
-            font-weight: 700;
-            color: var(--accent);
-        }}
-
-        .collision-text {{
-            font-size: 0.95rem;
-            line-height: 1.6;
-            margin: 0;
-            font-style: italic;
-        }}
 
-        .footer-metrics {{
-            position: absolute;
-            bottom: 40px;
-            left: 60px;
-            right: 60px;
-            font-family: 'JetBrains Mono', monospace;
-            font-size: 0.65rem;
-            text-transform: uppercase;
-            color: #888;
-            display: flex;
-            justify-content: space-between;
-            border-top: 1px solid #ddd;
-            padding-top: 10px;
-        }}
-        
-        .card-glyph {{
-            font-size: 1.8rem;
-            font-family: serif;
-            color: var(--accent);
-        }}
-        .card-glyph.black {{ color: var(--ink); }}
-    </style>
-</head>
-<body>
-"""
-
-    # Generate only a 3-day sample to see the prototype
-    for day_offset in range(3):
-        current_date = start_date + datetime.timedelta(days=day_offset)
-        period_idx = day_offset // 52
-        planetary_period_name = ROWS[period_idx]
-        
-        fractal_day_idx = day_offset % 52
-        fractal_card = full_chain[fractal_day_idx]
-        
-        global_card, _ = get_birth_card(current_date.month, current_date.day)
-        global_card_location = get_card_location(global_card, yearly_grid, yearly_crown)
-        collision_planet = global_card_location.get('row', 'Crown / Unanchored')
-        
-        # Determine Color for cards
-        f_color = "black" if "♠" in fractal_card or "♣" in fractal_card else ""
-        g_color = "black" if "♠" in global_card or "♣" in global_card else ""
-        
-        paragraph = generate_sentence(planetary_period_name, fractal_card, collision_planet)
-
-        # Build Page
-        html_content += f"""
-    <!-- PAGE: DAY {day_offset + 1} -->
-    <div class="book-page">
-        <h1 class="header">
-            {current_date.strftime("%a, %b %d")}
-            <span class="date">Day {day_offset + 1:03d} / 364</span>
-        </h1>
-        
-        <div class="metadata-bar">
-            <div>Owner: <strong>{first_name.upper()}</strong></div>
-            <div>Age Matrix: <strong>{spread_year}</strong></div>
-            <div>Birth Anchor: <strong>{user_birth_card}</strong></div>
-        </div>
-
-        <div class="data-header">
-            System Period: {planetary_period_name.upper()}
-        </div>
-        
-        <div style="display: flex; align-items: center; margin-top: 10px;">
-            <div style="font-size: 0.85rem; font-family: 'JetBrains Mono', monospace; margin-right: 15px;">FRACTAL VARIABLE:</div>
-            <div class="card-glyph {f_color}">{fractal_card}</div>
-        </div>
-
-        <p class="reading-paragraph">
-            {paragraph}
-        </p>
-
-        <div class="collision-box">
-            <div style="display: flex; align-items: center; margin-bottom: 10px;">
-                <div style="font-size: 0.75rem; font-family: 'JetBrains Mono', monospace; margin-right: 15px; color: #555;">GLOBAL OVERRIDE:</div>
-                <div class="card-glyph {g_color}" style="font-size: 1.4rem;">{global_card}</div>
-            </div>
-            <p class="collision-text">
-                The global environment operates exactly at the {global_card} coordinate today. Because this variable lands mathematically inside your {collision_planet.upper()} line, {COLLISION_SUFFIXES.get(collision_planet, COLLISION_SUFFIXES['Crown / Unanchored']).lower()}
-            </p>
-        </div>
-
-        <div class="footer-metrics">
-            <div>Algorithm: Analog</div>
-            <div>Print Authorization Valid</div>
-            <div>ID: TAA-{target_year}-{first_name[:3].upper()}-{day_offset:04d}</div>
-        </div>
-    </div>
-"""
-
-    html_content += """
-</body>
-</html>
-"""
-    
-    # Write to file
-    with open("planner_prototype.html", "w", encoding="utf-8") as f:
-        f.write(html_content)
+    calendar_days = itertools.islice(
+        generate_daily_calendar(first_name, birth_year, birth_month, birth_day, target_year),
+        first_day, first_day + days)
+    stream = _env.get_template('planner.html').stream(
+        first_name=first_name,
+        fonts_href=FONTS_HREF,
+        owner=first_name.upper(),
+        owner_tag=first_name[:3].upper(),
+        target_year=target_year,
+        spread_year=spread_year,
+        birth_card=user_birth_card,
+        pages=_planner_pages(calendar_days, start_date),
+    )
+    stream.enable_buffering(size=16)
+    stream.dump(fh)
+
+def generate_html_planner(first_name, birth_year, birth_month, birth_day, target_year=2026,
+                          output_path=None, days=364):
+    """Writes the subscriber's full-year planner to output_path and returns the path."""
+    if output_path is None:
+        output_path = f"Analog_Planner_{first_name}_{target_year}.html"
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        render_html_planner(f, first_name, birth_year, birth_month, birth_day, target_year, days)
     
-    print("Successfully generated beautifully formatted physical planner prototype.")
+    print(f"Successfully generated {days}-day physical planner: {output_path}")
+    return output_path
 
 
 if __name__ == "__main__":
@@ -1,8 +1,13 @@
 # generate_letter.py - Clean Launch Version with fixed birth card lookup
 
+import argparse
+import collections
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from weasyprint import HTML
-import os
 
 # ====================== CORE ENGINE ======================
 YEAR_0 = ['7♥','6♥','5♥','4♥','3♥','2♥','A♥','A♣','K♥','Q♥','J♥','10♥','9♥','8♥',
@@ -65,6 +70,15 @@ def get_rank_archetype(card):
     return arch.get(r, r)
 
 # ====================== GENERATE LETTER ======================
+def compose_letter_body(period_card, planet):
+    return f"""You're already doing that thing again.
+
+The pattern running right now is the {get_rank_archetype(period_card)} in the {get_suit_realm(period_card).lower()} domain, activated through {planet.lower()} perception.
+
+The uncomfortable line: this is costing you more than you're admitting.
+
+The question that lingers: what would a single day look like if you measured it by what you kept instead of what you shipped?"""
+
 def generate_letter(first_name, birth_str, target_month_year="2026-03"):
     birth_date = datetime.strptime(birth_str, "%Y-%m-%d")
     target_date = datetime.strptime(f"{target_month_year}-15", "%Y-%m-%d")
@@ -85,13 +99,8 @@ def generate_letter(first_name, birth_str, target_month_year="2026-03"):
     period_card = seven[period_idx]
     planet = ["Mercury","Venus","Mars","Jupiter","Saturn","Uranus","Neptune"][period_idx]
 
-    letter_body = f"""You're already doing that thing again.
-
-The pattern running right now is the {get_rank_archetype(period_card)} in the {get_suit_realm(period_card).lower()} domain, activated through {planet.lower()} perception.
-
-The uncomfortable line: this is costing you more than you're admitting.
-
-The question that lingers: what would a single day look like if you measured it by what you kept instead of what you shipped?"""
+    letter_body = compose_letter_body(period_card, planet)
+    body_html = letter_body.replace('\n', '<br><br>')
 
     html = f"""<!DOCTYPE html>
 <html lang="en">
@@ -108,7 +117,7 @@ The question that lingers: what would a single day look like if you measured it
 <body>
     <div class="header">&spades; &hearts; &clubs; &diams;   THE ANALOG ALGORITHM</div>
     <h1>Dear {first_name},</h1>
-    {letter_body.replace('\n', '<br><br>')}
+    {body_html}
     <div class="footer">
         Confidential to {first_name} • {datetime.strptime(target_month_year, "%Y-%m").strftime("%B %Y")} • The Analog Algorithm
     </div>
@@ -119,5 +128,164 @@ The question that lingers: what would a single day look like if you measured it
     HTML(string=html).write_pdf(filename)
     print(f"✅ Generated: {filename}")
 
+# ====================== CSV BATCH ======================
+# Rows stream from the CSV through bounded windows of render futures (process
+# pool) and, with --send-emails, delivery futures (pooled SMTP), and are
+# recorded in the manifest in CSV order once both stages finish. The manifest
+# is therefore always a prefix of the CSV: a rerun skips that many rows and
+# continues. Memory stays flat no matter how many rows the CSV has.
+
+MANIFEST_FIELDS = ["row", "first_name", "email", "target_month_year", "status", "pdf_path", "detail",
+                   "email_status"]
+
+def _init_worker():
+    from app import pdf_generator
+    pdf_generator.get_renderer()  # Compile the template and load fonts once per process
+
+def render_subscriber_letter(job):
+    """Renders one CSV row through app.engine and app.pdf_generator (runs in a worker process)."""
+    from app import engine, pdf_generator
+    row_no, row, out_dir, default_month = job
+    first_name = row["first_name"].strip()
+    target = (row.get("target_month_year") or default_month).strip()
+    try:
+        b_year, b_month, b_day = map(int, row["birth_date"].strip().split("-"))
+        data = engine.calculate_letter_data(first_name, b_year, b_month, b_day, f"{target}-15")
+        if "error" in data:
+            return row_no, "skipped", "", data["error"]
+        slug = pdf_generator.filename_slug(first_name)
+        pdf_path = os.path.join(out_dir, f"analog-algo-{row_no:07d}-{slug}-{target}.pdf")
+        pdf_generator.render_pdf(target, first_name, compose_letter_body(data.period_card, data.planet),
+                                 additional_data=data, output_path=pdf_path)
+        return row_no, "rendered", pdf_path, ""
+    except Exception as e:
+        return row_no, "failed", "", f"{type(e).__name__}: {e}"
+
+def _resume_point(manifest_path):
+    """Number of rows already recorded; drops a half-written trailing record left by a crash.
+
+    Counts CSV records, not lines: a quoted field (a name, an error message) may contain newlines.
+    """
+    if not os.path.exists(manifest_path):
+        return 0
+    records, complete_size = 0, 0
+    read = {"bytes": 0, "line": ""}  # What the csv reader has consumed so far
+
+    def lines(f):
+        for line in f:
+            read["bytes"] += len(line.encode("utf-8"))
+            read["line"] = line
+            yield line
+
+    with open(manifest_path, newline="", encoding="utf-8") as f:
+        try:
+            for _ in csv.reader(lines(f), strict=True):
+                if not read["line"].endswith("\n"):
+                    break  # Cut off mid-record
+                records += 1
+                complete_size = read["bytes"]
+        except csv.Error:  # Ended inside a quoted field
+            pass
+    if complete_size < os.path.getsize(manifest_path):
+        with open(manifest_path, "r+b") as f:
+            f.truncate(complete_size)
+    return max(records - 1, 0)  # Minus the header
+
+def run_csv_batch(csv_path, out_dir="letters", manifest_path=None, workers=None, default_month="2026-03",
+                  window=None, delivery=None):
+    """Renders a letter for every row of csv_path, resuming from manifest_path if present. Returns status counts.
+
+    With an app.mailer.EmailDelivery, each rendered letter is also emailed to the row's address.
+    Resuming continues after the last recorded row: rows recorded as failed (or with a failed
+    email_status) are not retried. Re-run them from a CSV of just those rows.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = manifest_path or os.path.join(out_dir, "manifest.csv")
+    workers = workers or os.cpu_count()
+    window = window or workers * 4
+    done = _resume_point(manifest_path)
+    counts = collections.Counter()
+
+    if done:
+        print(f"Resuming after {done} rows already in {manifest_path}")
+    started = time.perf_counter()
+    with open(csv_path, newline="", encoding="utf-8") as src, \
+            open(manifest_path, "a", newline="", encoding="utf-8") as manifest_file, \
+            ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        manifest = csv.DictWriter(manifest_file, fieldnames=MANIFEST_FIELDS)
+        if done == 0 and manifest_file.tell() == 0:
+            manifest.writeheader()
+        rendering = collections.deque()  # (render future, row)
+        sending = collections.deque()  # (render result, row, email future or None)
+
+        def rendered(future, row):
+            result = future.result()
+            email = (row.get("email") or "").strip()
+            email_future = None
+            if delivery and result[1] == "rendered" and email:
+                email_future = delivery.submit(email, row["first_name"].strip(), result[2])
+            sending.append((result, row, email_future))
+            if len(sending) >= window:
+                record(*sending.popleft())
+
+        def record(result, row, email_future):
+            row_no, status, pdf_path, detail = result
+            email_status = ""
+            if email_future is not None:
+                try:
+                    email_future.result()
+                    email_status = "sent"
+                except Exception as e:
+                    email_status = f"failed: {type(e).__name__}: {e}"
+                counts["emailed" if email_status == "sent" else "email_failed"] += 1
+            manifest.writerow({"row": row_no, "first_name": row["first_name"], "email": row.get("email", ""),
+                               "target_month_year": row.get("target_month_year") or default_month,
+                               "status": status, "pdf_path": pdf_path, "detail": detail,
+                               "email_status": email_status})
+            manifest_file.flush()
+            counts[status] += 1
+            processed = counts["rendered"] + counts["skipped"] + counts["failed"]
+            if processed % 1000 == 0:
+                print(f"  {done + processed} rows ({processed / (time.perf_counter() - started):.0f}/s): {dict(counts)}")
+
+        for row_no, row in enumerate(csv.DictReader(src)):
+            if row_no < done:
+                continue
+            rendering.append((pool.submit(render_subscriber_letter, (row_no, row, out_dir, default_month)), row))
+            if len(rendering) >= window:
+                rendered(*rendering.popleft())
+        while rendering:
+            rendered(*rendering.popleft())
+        while sending:
+            record(*sending.popleft())
+
+    print(f"✅ Batch finished in {time.perf_counter() - started:.1f}s: {dict(counts)} (manifest: {manifest_path})")
+    if delivery:
+        stats = delivery.stats()
+        print(f"   Email: {stats['sent']} sent, {stats['failed']} failed, {stats['retries']} retries over "
+              f"{stats['connections_opened']} connections; {stats['per_second']:.1f}/s, "
+              f"p50 {stats['latency_ms_p50']:.0f} ms, p95 {stats['latency_ms_p95']:.0f} ms")
+    return counts
+
 if __name__ == "__main__":
-    generate_letter("Cassidy", "1991-02-17", "2026-03")
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Generate Analog Algorithm letters.")
+    parser.add_argument("--csv", help="Subscribers CSV (first_name, birth_date, email, target_month_year)")
+    parser.add_argument("--out-dir", default="letters", help="Where batch PDFs and the manifest are written")
+    parser.add_argument("--manifest", default=None, help="Manifest path (default: OUT_DIR/manifest.csv)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--month", default="2026-03", help="Letter month for rows without target_month_year")
+    parser.add_argument("--send-emails", action="store_true", help="Email each letter via SMTP (see .env.example)")
+    args = parser.parse_args()
+
+    if args.csv:
+        delivery = None
+        if args.send_emails:
+            from app.mailer import EmailDelivery
+            delivery = EmailDelivery.from_env()
+        try:
+            run_csv_batch(args.csv, args.out_dir, args.manifest, args.workers, args.month, delivery=delivery)
+        finally:
+            if delivery:
+                delivery.close()
+    else:
+        generate_letter("Cassidy", "1991-02-17", "2026-03")
\ No newline at end of file
@@ -0,0 +1,24 @@
+import csv
+
+from generate_letter import MANIFEST_FIELDS, _resume_point
+
+def test_resume_counts_records_not_lines(tmp_path):
+    path = tmp_path / "manifest.csv"
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        manifest = csv.DictWriter(f, fieldnames=MANIFEST_FIELDS)
+        manifest.writeheader()
+        for row in range(3):
+            manifest.writerow({"row": row, "first_name": "Ann\nMarie", "status": "failed",
+                               "detail": "ValueError: bad date\non two lines"})
+    complete = path.read_bytes()
+    assert _resume_point(str(path)) == 3
+
+    # A crash mid-record, even just after a newline inside a quoted field, is dropped
+    with open(path, "ab") as f:
+        f.write(b'3,"Ann\nMar')
+    assert _resume_point(str(path)) == 3
+    assert path.read_bytes() == complete
+    with open(path, "ab") as f:
+        f.write(b'3,"Ann\n')
+    assert _resume_point(str(path)) == 3
+    assert path.read_bytes() == complete
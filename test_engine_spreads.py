@@ -0,0 +1,87 @@
+from app import engine
+
+
+def _shuffled(spread_year):
+    flat = engine.YEAR_0[:]
+    for _ in range(spread_year):
+        flat = [flat[i] for i in engine.P]
+    return flat
+
+
+def _flatten(grid, crown):
+    return [card for rn in engine.ROWS for card in grid[rn]] + list(crown)
+
+
+def test_spread_table_matches_repeated_shuffles():
+    for year in range(engine.MAX_SPREAD_YEAR + 1):
+        grid, crown = engine.generate_yearly_spread_data(year)
+        assert _flatten(grid, crown) == _shuffled(year)
+
+
+def test_spread_for_year_wraps_past_table():
+    for k in (91, 150, 1000, -1):
+        assert engine.spread_for_year(k) == engine.spread_for_year(k % engine.P_ORDER)
+    assert _flatten(*engine.spread_for_year(137)) == _shuffled(137)
+
+
+def test_locate_matches_spread_layout():
+    for year in (0, 1, 36, 90):
+        grid, crown = engine.generate_yearly_spread_data(year)
+        for ri, rn in enumerate(engine.ROWS):
+            for ci, card in enumerate(grid[rn]):
+                assert engine.locate(card, year) == (ri, ci)
+        for cidx, card in enumerate(crown):
+            assert engine.locate(card, year) == (engine.CROWN_ROW, cidx)
+    assert engine.locate("Joker", 36) is None
+
+
+def test_full_chain_is_cached_rotation_of_extract_chain():
+    for year in (1, 36, 90):
+        grid, crown = engine.generate_yearly_spread_data(year)
+        for card in ("8♦", "K♠", "7♥", "J♠"):
+            chain = engine.extract_chain(grid, crown, card, 52)
+            assert list(engine.full_chain(year, card)) == chain
+            assert chain[-1] == card
+            assert engine.extract_chain(grid, crown, card, 90) == chain + chain[:38]
+    assert engine.full_chain(36, "8♦") is engine.full_chain(36, "8♦")
+
+
+def test_calculate_letter_data_many_matches_scalar():
+    rows = [(1991, 2, 17, "2026-02-21"), (2000, 2, 29, "2026-03-15"), (1950, 11, 3, "2026-12-30"),
+            (1936, 7, 4, "2026-09-01"), (1980, 12, 31, "2026-03-15")]
+    years, months, days, targets = zip(*rows)
+    out = engine.calculate_letter_data_many(years, months, days, targets, names=True)
+    for i, row in enumerate(rows):
+        data = engine.calculate_letter_data("X", *row)
+        if "error" in data:
+            assert not out["valid"][i]
+            continue
+        assert out["birth_card"][i] == data["birth_card"]
+        assert out["age"][i] == data["age"]
+        assert out["spread_year"][i] == data["spread_year"]
+        assert out["period_card"][i] == data["period"]["card"]
+        assert out["planet"][i] == data["period"]["planet"]
+        assert out["days_since"][i] == data["period"]["days_since"]
+        for key in ("long_range", "pluto", "result", "displacement", "environment"):
+            assert out[key][i] == data["year_long"][key]
+
+
+def test_reading_cache_counts_hits_misses_and_evictions():
+    cache = engine.ReadingCache(maxsize=2)
+    first = cache.get(engine.CARD_IDS["8♦"], 36, 0)
+    assert cache.get(engine.CARD_IDS["8♦"], 36, 0) is first
+    cache.get(engine.CARD_IDS["8♦"], 36, 1)
+    cache.get(engine.CARD_IDS["K♠"], 36, 1)
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["size"]) == (1, 3, 1, 2)
+    assert first == ("7♦", "4♦", "3♦", "K♦", "6♦", "8♠")
+
+
+def test_letter_data_resolves_year_long_cards_lazily():
+    data = engine.calculate_letter_data("Cassidy", 1991, 2, 17, "2026-02-21")
+    assert data["period"] == {"card": "7♦", "planet": "Mercury", "days_since": 5}
+    assert data._year_long is None
+    assert data.to_dict()["year_long"] == {
+        "long_range": "4♦", "pluto": "3♦", "result": "K♦", "displacement": "6♦", "environment": "8♠"
+    }
+    assert data.get("birth_card") == "8♦" and "error" not in data
@@ -0,0 +1,120 @@
+import asyncio
+import http.server
+import threading
+import time
+
+import pytest
+import requests
+
+from app.http_clients import AsyncProviderClient, CircuitBreaker, CircuitOpenError, ProviderClient
+
+class ScriptedServer(http.server.ThreadingHTTPServer):
+    """Local stand-in provider: each path answers with the next scripted status (then 200s)."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), ScriptedHandler)
+        self.scripts = {}
+        self.hits = {}
+        self.connections = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+class ScriptedHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def respond(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        with self.server.lock:
+            self.server.hits[self.path] = self.server.hits.get(self.path, 0) + 1
+            script = self.server.scripts.get(self.path, [])
+            status = script.pop(0) if script else 200
+        if status == "hang":
+            time.sleep(1)
+            status = 200
+        body = b'{"ok": true}'
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if status == 429:
+            self.send_header("Retry-After", "0")
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = respond
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def provider():
+    server = ScriptedServer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def make_client(cls=ProviderClient, failure_threshold=5, **kwargs):
+    breaker = CircuitBreaker("Test", failure_threshold=failure_threshold, reset_timeout=0.2)
+    options = {"backoff": 0.01, "read_timeout": 0.3, **kwargs}
+    return cls("Test", breaker, **options)
+
+def test_retries_429_and_5xx_on_one_kept_alive_connection(provider):
+    provider.scripts["/orders"] = [503, 429, 502]
+    client = make_client()
+    assert client.get(f"{provider.url}/orders").status_code == 200
+    assert client.get(f"{provider.url}/orders").status_code == 200
+    assert provider.hits["/orders"] == 5
+    assert provider.connections == 1
+    client.close()
+
+def test_posts_retry_only_with_an_idempotency_key(provider):
+    provider.scripts["/letters"] = [503, 503]
+    client = make_client()
+    assert client.post(f"{provider.url}/letters", data={"a": 1}).status_code == 503
+    assert client.post(f"{provider.url}/letters", data={"a": 1}, headers={"Idempotency-Key": "k1"}).status_code == 200
+    assert provider.hits["/letters"] == 3
+
+def test_hung_calls_time_out(provider):
+    provider.scripts["/slow"] = ["hang"]
+    client = make_client(max_retries=0)
+    started = time.perf_counter()
+    with pytest.raises(requests.Timeout):
+        client.get(f"{provider.url}/slow")
+    assert time.perf_counter() - started < 0.9
+
+def test_breaker_fails_fast_then_recovers(provider):
+    provider.scripts["/down"] = [500, 500, 500]
+    client = make_client(failure_threshold=3, max_retries=0)
+    assert [client.get(f"{provider.url}/down").status_code for _ in range(3)] == [500, 500, 500]
+    with pytest.raises(CircuitOpenError):
+        client.get(f"{provider.url}/down")
+    assert provider.hits["/down"] == 3  # Failed fast, never reached the provider
+
+    time.sleep(0.25)  # Half-open: one trial call goes through and closes the breaker
+    assert client.get(f"{provider.url}/down").status_code == 200
+    assert client.breaker.state == "closed"
+
+def test_async_client_retries_and_shares_the_breaker(provider):
+    provider.scripts["/letters"] = [503, 500]
+    client = make_client(AsyncProviderClient)
+
+    async def post():
+        try:
+            return await client.post(f"{provider.url}/letters", headers={"Idempotency-Key": "k2"})
+        finally:
+            await client.close()
+
+    assert asyncio.run(post()).status_code == 200
+    assert provider.hits["/letters"] == 3
+    assert client.breaker.failures == 0
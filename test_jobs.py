@@ -0,0 +1,87 @@
+import time
+
+import pytest
+
+from app.jobs import JobFailed, JobQueue, JobWorkers
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    yield queue
+    queue.close()
+
+def wait_for(queue, job_id, states=("succeeded", "failed"), timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = queue.get(job_id)
+        if job["state"] in states:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} stuck in {job['state']}")
+
+def test_workers_retry_with_backoff_until_success(queue):
+    calls = []
+
+    def flaky(payload):
+        calls.append(time.time())
+        if len(calls) < 3:
+            raise ConnectionError("Lob is down")
+        return {"echo": payload["n"]}
+
+    workers = JobWorkers(queue, {"letter": flaky}, concurrency=2, backoff=0.05, poll_interval=0.01)
+    workers.start()
+    job = wait_for(queue, queue.enqueue("letter", {"n": 7}))
+    workers.stop()
+
+    assert job["state"] == "succeeded" and job["attempts"] == 3 and job["result"] == {"echo": 7}
+    assert calls[2] - calls[1] >= 0.05 * 2 * 0.5  # Backoff doubles (with jitter in [0.5, 1])
+
+def test_permanent_failures_and_exhausted_retries(queue):
+    def reject(payload):
+        if payload["permanent"]:
+            raise JobFailed("Joker cannot receive a spread.")
+        raise RuntimeError("still down")
+
+    workers = JobWorkers(queue, {"letter": reject}, concurrency=1, backoff=0.001, poll_interval=0.01)
+    workers.start()
+    permanent = wait_for(queue, queue.enqueue("letter", {"permanent": True}))
+    exhausted = wait_for(queue, queue.enqueue("letter", {"permanent": False}, max_attempts=3))
+    workers.stop()
+
+    assert (permanent["state"], permanent["attempts"]) == ("failed", 1)
+    assert (exhausted["state"], exhausted["attempts"], exhausted["error"]) == ("failed", 3, "RuntimeError: still down")
+
+def test_jobs_survive_a_restart(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    before = JobQueue(path, lease_seconds=0)
+    queued = before.enqueue("letter", {"n": 1})
+    interrupted = before.enqueue("letter", {"n": 2})
+    assert before.claim()["id"] == queued  # Claimed, then the process dies mid-job
+    before.close()
+
+    after = JobQueue(path)
+    claimed = [after.claim(), after.claim()]
+    assert {job["id"] for job in claimed} == {queued, interrupted}
+    assert {job["id"]: job["attempts"] for job in claimed} == {queued: 2, interrupted: 1}
+    assert after.claim() is None
+    after.close()
+
+def test_lost_leases_cannot_record_results_or_exceed_max_attempts(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"), lease_seconds=0)
+    job_id = queue.enqueue("letter", {"n": 1}, max_attempts=2)
+    slow = queue.claim()
+    time.sleep(0.01)
+    reclaimed = queue.claim()  # The slow worker's lease expired
+    assert (slow["attempts"], reclaimed["attempts"]) == (1, 2)
+
+    assert queue.complete(job_id, reclaimed["attempts"], {"by": "reclaimer"})
+    assert not queue.complete(job_id, slow["attempts"], {"by": "slow"})
+    assert not queue.fail(job_id, slow["attempts"], "late failure")
+    assert queue.get(job_id)["result"] == {"by": "reclaimer"}
+
+    stuck = queue.enqueue("letter", {"n": 2}, max_attempts=1)
+    assert queue.claim()["id"] == stuck
+    time.sleep(0.01)
+    assert queue.claim() is None  # Its only attempt is spent
+    assert queue.get(stuck)["state"] == "failed"
+    queue.close()
@@ -0,0 +1,175 @@
+import csv
+import http.server
+import json
+import threading
+import time
+
+import pytest
+
+from app import integrations
+from app.http_clients import CircuitBreaker, ProviderClient
+from app.integrations import AddressCache, AddressVerifier
+from app.lob_bulk import TokenBucket, letter_idempotency_key, send_letters_bulk
+
+class FakeLob(http.server.ThreadingHTTPServer):
+    """Local Lob stand-in with injectable latency and errors; honours Idempotency-Key like Lob."""
+
+    daemon_threads = True
+
+    def __init__(self, latency=0.0, fail_every=0, status=500):
+        super().__init__(("127.0.0.1", 0), FakeLobHandler)
+        self.latency = latency
+        self.fail_every = fail_every  # First attempt of every Nth new key gets `status`
+        self.status = status
+        self.letters = {}  # Idempotency-Key -> letter id
+        self.seen = set()
+        self.failed_keys = set()
+        self.requests = 0
+        self.verified = []  # primary_line of every address sent for verification
+        self.lock = threading.Lock()
+
+class FakeLobHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path.endswith("/bulk/us_verifications"):
+            return self.verify(json.loads(body)["addresses"])
+        time.sleep(self.server.latency)
+        key = self.headers["Idempotency-Key"]
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            first_attempt = key not in server.seen
+            server.seen.add(key)
+            if first_attempt and server.fail_every and len(server.seen) % server.fail_every == 0:
+                server.failed_keys.add(key)
+                status, body = server.status, {"error": {"message": "injected"}}
+            else:
+                letter_id = server.letters.setdefault(key, f"ltr_{len(server.letters):06d}")
+                status, body = 200, {"id": letter_id}
+        self.respond(status, body)
+
+    def verify(self, addresses):
+        with self.server.lock:
+            self.server.verified.extend(a["primary_line"] for a in addresses)
+        self.respond(200, {"addresses": [{
+            "primary_line": a["primary_line"].upper(),
+            "secondary_line": "",
+            "components": {"city": a["city"].upper(), "state": a["state"], "zip_code": a["zip_code"],
+                           "zip_code_plus_4": "1234"},
+            "deliverability": "undeliverable" if "Nowhere" in a["primary_line"] else "deliverable",
+        } for a in addresses], "errors": False})
+
+    def respond(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def fake_lob(request, monkeypatch, tmp_path):
+    server = FakeLob(**getattr(request, "param", {}))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv("LOB_API_BASE", f"http://127.0.0.1:{server.server_address[1]}/v1")
+    monkeypatch.setenv("LOB_API_KEY", "test_key")
+    monkeypatch.setenv("LOB_ADDRESS_CACHE_DB", str(tmp_path / "address_cache.db"))
+    monkeypatch.delitem(integrations._clients, "address_verifier", raising=False)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def lob_client():
+    return ProviderClient("Lob", CircuitBreaker("Lob", failure_threshold=50), backoff=0.01, max_retries=3)
+
+def letters(count, month="2026-03"):
+    address = {"name": "Reader", "address_line1": "1 Main St", "city": "Portland", "state": "OR", "zip_code": "97204"}
+    return ({"subscriber_id": f"sub-{i}", "month": month, "pdf": b"%PDF-1.7\n%%EOF", "address": address}
+            for i in range(count))
+
+@pytest.mark.parametrize("fake_lob", [{"latency": 0.02, "fail_every": 10}], indirect=True)
+def test_bulk_send_retries_without_double_mailing(fake_lob, tmp_path):
+    report_path = str(tmp_path / "lob_report.csv")
+    summary = send_letters_bulk(letters(200), concurrency=16, rate=1000, report_path=report_path, client=lob_client())
+
+    assert (summary["sent"], summary["failed"]) == (200, 0)
+    assert len(fake_lob.letters) == 200 and len(fake_lob.failed_keys) == 20
+    assert fake_lob.requests == 220
+    # 200 x 20ms of server latency alone is 4s one at a time
+    assert summary["seconds"] < 200 * 0.02 / 2
+
+    with open(report_path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [row["subscriber_id"] for row in rows] == [f"sub-{i}" for i in range(200)]
+    assert {row["letter_id"] for row in rows} == set(fake_lob.letters.values())
+
+    # Re-running the same month's batch mails nobody twice
+    again = send_letters_bulk(letters(200), concurrency=16, rate=1000, client=lob_client())
+    assert again["sent"] == 200 and len(fake_lob.letters) == 200
+
+    # Re-running against the earlier report, even after Lob has forgotten the keys, sends only what is new
+    fake_lob.letters.clear()
+    requests = fake_lob.requests
+    resumed = send_letters_bulk(letters(201), concurrency=16, rate=1000, report_path=report_path, client=lob_client())
+    assert (resumed["already_sent"], resumed["sent"], fake_lob.requests) == (200, 1, requests + 1)
+    with open(report_path, newline="") as f:
+        ledger = {row["subscriber_id"]: row for row in csv.DictReader(f)}
+    assert ledger["sub-7"]["status"] == "already_sent" and ledger["sub-7"]["letter_id"] == rows[7]["letter_id"]
+
+@pytest.mark.parametrize("fake_lob", [{"fail_every": 1, "status": 422}], indirect=True)
+def test_rejected_letters_are_reported_as_failed(fake_lob):
+    summary = send_letters_bulk(letters(3), concurrency=2, rate=1000, client=lob_client())
+    assert (summary["sent"], summary["failed"]) == (0, 3)
+    assert fake_lob.requests == 3  # 4xx is not retried
+
+def test_rate_limit_and_idempotency_keys(fake_lob):
+    started = time.perf_counter()
+    summary = send_letters_bulk(letters(30), concurrency=8, rate=50, burst=5, client=lob_client())
+    assert summary["sent"] == 30
+    assert time.perf_counter() - started >= (30 - 5) / 50 * 0.9
+
+    bucket = TokenBucket(rate=100, capacity=1)
+    started = time.perf_counter()
+    for _ in range(11):
+        bucket.acquire()
+    assert time.perf_counter() - started >= 0.09
+
+    # Below one token per second the bucket still holds a whole token
+    slow = TokenBucket(rate=0.5)
+    started = time.perf_counter()
+    slow.acquire()
+    assert slow.capacity == 1 and time.perf_counter() - started < 0.1
+
+    assert letter_idempotency_key("sub-1", "2026-03") == letter_idempotency_key("sub-1", "2026-03")
+    assert letter_idempotency_key("sub-1", "2026-03") != letter_idempotency_key("sub-1", "2026-04")
+
+def test_addresses_are_verified_in_batches_and_cached(fake_lob, tmp_path):
+    cache = AddressCache(str(tmp_path / "addresses.db"))
+    verifier = AddressVerifier(cache, client=lob_client())
+    addresses = [{"name": f"Reader {i}", "address_line1": f"{i} Main St", "city": "Portland", "state": "OR",
+                  "zip_code": "97204"} for i in range(45)]
+    results = verifier.verify_many(addresses)
+    assert verifier.requests == 3 and len(fake_lob.verified) == 45  # 20 + 20 + 5
+    assert results[7]["deliverable"] is True
+    assert results[7]["address"] == {"name": "Reader 7", "address_line1": "7 MAIN ST", "city": "PORTLAND",
+                                     "state": "OR", "zip_code": "97204-1234"}
+
+    # Next month: the same addresses in another spelling, plus one new one, which alone goes to Lob
+    respelled = [{**a, "address_line1": a["address_line1"].lower() + ".", "zip_code": "97204-0000"} for a in addresses]
+    moved = {"name": "Mover", "address_line1": "1 Nowhere Rd", "city": "Portland", "state": "OR", "zip_code": "97204"}
+    results = verifier.verify_many(respelled + [moved])
+    assert fake_lob.verified[45:] == ["1 Nowhere Rd"]
+    assert results[-1]["deliverable"] is False and results[0]["deliverable"] is True
+
+    # Undeliverable addresses are reported, never mailed; expired entries are verified again
+    summary = send_letters_bulk(({"subscriber_id": "sub-x", "month": "2026-03", "pdf": b"%PDF", "address": moved},),
+                                rate=1000, client=lob_client(), verifier=verifier)
+    assert (summary["sent"], summary["undeliverable"], fake_lob.requests) == (0, 1, 0)
+    cache.ttl = 0
+    verifier.verify(addresses[0])
+    assert len(fake_lob.verified) == 47
@@ -0,0 +1,117 @@
+import email
+import smtplib
+import socketserver
+import threading
+
+import pytest
+
+from app.mailer import EmailDelivery, SmtpPool
+
+class StandInSmtpServer(socketserver.ThreadingTCPServer):
+    """Just enough SMTP for the delivery stage; can answer the first DATA commands with 451."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, transient_failures=0, refused=()):
+        super().__init__(("127.0.0.1", 0), SmtpHandler)
+        self.messages = []
+        self.connections = 0
+        self.transient_failures = transient_failures
+        self.refused = set(refused)
+        self.lock = threading.Lock()
+
+class SmtpHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        self.reply("220 stand-in ready")
+        recipients = []
+        while True:
+            line = self.rfile.readline().decode().strip()
+            if not line:
+                return
+            verb = line.split(" ", 1)[0].upper()
+            if verb in ("EHLO", "HELO"):
+                self.reply("250 stand-in")
+            elif verb == "MAIL":
+                recipients = []
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                address = line.split(":", 1)[1].strip("<> ")
+                if address in server.refused:
+                    self.reply("550 no such user")
+                else:
+                    recipients.append(address)
+                    self.reply("250 OK")
+            elif verb == "DATA":
+                with server.lock:
+                    fail = server.transient_failures > 0
+                    server.transient_failures -= fail
+                if fail:
+                    self.reply("451 try again later")
+                    continue
+                self.reply("354 go ahead")
+                data = []
+                while (chunk := self.rfile.readline()) != b".\r\n":
+                    data.append(chunk)
+                with server.lock:
+                    server.messages.append((recipients, email.message_from_bytes(b"".join(data))))
+                self.reply("250 queued")
+            elif verb == "RSET" or verb == "NOOP":
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("502 not implemented")
+
+@pytest.fixture
+def smtp_server(request):
+    server = StandInSmtpServer(**getattr(request, "param", {}))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    path = tmp_path / "analog-algo-0000001-cassidy-2026-03.pdf"
+    path.write_bytes(b"%PDF-1.7\n%test\n%%EOF")
+    return str(path)
+
+def make_delivery(server, size=3, **kwargs):
+    pool = SmtpPool("127.0.0.1", server.server_address[1], starttls=False, size=size, timeout=5)
+    return EmailDelivery(pool, sender="letters@analogalgo.com", backoff=0.01, **kwargs)
+
+def test_pooled_delivery_reuses_connections(smtp_server, pdf_path):
+    delivery = make_delivery(smtp_server, size=3)
+    futures = [delivery.submit(f"reader{i}@example.com", "Cassidy", pdf_path) for i in range(30)]
+    assert all(f.result() == 1 for f in futures)
+    delivery.close()
+
+    assert len(smtp_server.messages) == 30
+    assert smtp_server.connections <= 3
+    stats = delivery.stats()
+    assert stats["sent"] == 30 and stats["failed"] == 0 and stats["connections_opened"] <= 3
+    recipients, message = smtp_server.messages[0]
+    attachment = next(part for part in message.walk() if part.get_content_type() == "application/pdf")
+    assert attachment.get_filename() == "analog-algo-0000001-cassidy-2026-03.pdf"
+    assert attachment.get_payload(decode=True).startswith(b"%PDF")
+
+@pytest.mark.parametrize("smtp_server", [{"transient_failures": 2, "refused": ["gone@example.com"]}], indirect=True)
+def test_transient_errors_retry_and_permanent_errors_fail_fast(smtp_server, pdf_path):
+    delivery = make_delivery(smtp_server, size=1)
+    assert delivery.submit("reader@example.com", "Cassidy", pdf_path).result() == 3
+    with pytest.raises(smtplib.SMTPRecipientsRefused):
+        delivery.submit("gone@example.com", "Cassidy", pdf_path).result()
+    delivery.close()
+
+    stats = delivery.stats()
+    assert (stats["sent"], stats["failed"], stats["retries"]) == (1, 1, 2)
+    assert len(smtp_server.messages) == 1
+    assert smtp_server.connections == 1  # Rejected replies leave the session usable
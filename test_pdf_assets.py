@@ -0,0 +1,34 @@
+import pathlib
+
+import pytest
+
+from app.pdf_generator import FONTS_DIR, LocalAssetFetcher
+
+
+def test_fetcher_serves_template_assets_and_refuses_everything_else(tmp_path):
+    root = tmp_path / "templates"
+    (root / "fonts").mkdir(parents=True)
+    (root / "fonts" / "fonts.css").write_text("@font-face {}")
+    (tmp_path / "templates-evil").mkdir()
+    (tmp_path / "templates-evil" / "fonts.css").write_text("stolen")
+    (tmp_path / "secret.txt").write_text("stolen")
+    fetcher = LocalAssetFetcher(root=str(root), preload_dir=str(root / "fonts"))
+
+    response = fetcher.fetch((root / "fonts" / "fonts.css").as_uri())
+    assert response.read() == b"@font-face {}" and response.headers["Content-Type"] == "text/css"
+
+    refused = [
+        "https://fonts.googleapis.com/css2?family=Inter",
+        "http://fonts.gstatic.com/s/inter/v1/inter.woff2",
+        "file:///etc/passwd",
+        (root / "fonts" / ".." / ".." / "secret.txt").as_uri(),
+        (tmp_path / "templates-evil" / "fonts.css").as_uri(),
+    ]
+    for url in refused:
+        with pytest.raises(ValueError, match="only local template assets"):
+            fetcher.fetch(url)
+
+    # The shipped fonts are preloaded and served without a trip to the network
+    shipped = LocalAssetFetcher()
+    font = next(pathlib.Path(FONTS_DIR).glob("*.woff2"))
+    assert shipped.fetch(font.as_uri()).read() == font.read_bytes()
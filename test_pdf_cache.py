@@ -0,0 +1,32 @@
+import os
+
+from app.pdf_cache import PdfCache
+
+
+def test_identical_inputs_hit_and_size_cap_evicts_lru(tmp_path):
+    cache = PdfCache(str(tmp_path), max_bytes=25)
+    inputs = {"first_name": "Cassidy", "date_str": "March 01, 2026", "bc": "8♦", "planet": "Mercury", "age": 35}
+    key = PdfCache.key("v1", inputs)
+    assert key == PdfCache.key("v1", dict(reversed(list(inputs.items()))))
+    assert key != PdfCache.key("v2", inputs)
+
+    assert cache.get(key) is None
+    cache.put(key, b"%PDF-first")
+    assert cache.get(key) == b"%PDF-first"
+    assert os.path.exists(os.path.join(str(tmp_path), key[:2], key[2:4], f"{key}.pdf"))
+
+    cache.put("b" * 64, b"%PDF-second")
+    cache.get(key)  # Most recently used again
+    cache.put("c" * 64, b"%PDF-third")
+    assert cache.get("b" * 64) is None
+    assert cache.get(key) == b"%PDF-first"
+    stats = cache.stats()
+    assert stats["evictions"] == 1 and stats["bytes"] <= 25
+    assert stats["hits"] == 3 and stats["misses"] == 2
+
+
+def test_index_survives_restart(tmp_path):
+    PdfCache(str(tmp_path)).put("d" * 64, b"%PDF-kept")
+    reopened = PdfCache(str(tmp_path))
+    assert reopened.stats()["entries"] == 1
+    assert reopened.get("d" * 64) == b"%PDF-kept"
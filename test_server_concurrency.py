@@ -0,0 +1,88 @@
+import asyncio
+import time
+
+import httpx
+
+from app import integrations, jobs, pdf_generator, server
+
+RENDER_SECONDS = 0.4
+
+def slow_render_pdf(*args, **kwargs):
+    time.sleep(RENDER_SECONDS)  # Blocks like a WeasyPrint layout pass
+    return b"%PDF-1.7\n%%EOF"
+
+async def health_latencies_while_rendering(letters):
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        body = {"first_name": "Cassidy", "birth_date": "1991-02-17", "target_month": "2026-03"}
+        renders = [asyncio.create_task(client.post("/admin/generate-test?download=true", json=body)) for _ in range(letters)]
+        await asyncio.sleep(0.05)  # Let the renders start
+
+        latencies = []
+        while not all(task.done() for task in renders):
+            started = time.perf_counter()
+            response = await client.get("/health")
+            latencies.append(time.perf_counter() - started)
+            assert response.status_code == 200
+            await asyncio.sleep(0.02)
+        responses = await asyncio.gather(*renders)
+    return latencies, responses
+
+def test_health_stays_fast_while_letters_render(monkeypatch):
+    monkeypatch.setattr(pdf_generator, "render_pdf", slow_render_pdf)
+    monkeypatch.delenv("LOB_API_KEY", raising=False)
+
+    latencies, responses = asyncio.run(health_latencies_while_rendering(letters=4))
+
+    assert all(r.status_code == 200 and r.content.startswith(b"%PDF") for r in responses)
+    # Four 0.4s renders on a bounded pool take >= 0.8s; /health must never wait on them
+    assert len(latencies) >= 10
+    assert max(latencies) < RENDER_SECONDS / 4
+
+async def enqueue_and_poll(queue):
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        body = {"first_name": "Cassidy", "birth_date": "1991-02-17", "target_month": "2026-03"}
+        accepted = await client.post("/admin/generate-test", json=body)
+        job_id = accepted.json()["job_id"]
+        queued = (await client.get(f"/jobs/{job_id}")).json()
+
+        workers = jobs.JobWorkers(queue, {"letter": server.run_letter_job}, concurrency=1, poll_interval=0.01)
+        workers.start()
+        while (done := (await client.get(f"/jobs/{job_id}")).json())["state"] not in ("succeeded", "failed"):
+            await asyncio.sleep(0.02)
+        workers.stop()
+        missing = await client.get("/jobs/nope")
+    return accepted, queued, done, missing
+
+def test_generate_enqueues_a_job_and_reports_its_state(monkeypatch, tmp_path):
+    queue = jobs.JobQueue(str(tmp_path / "jobs.db"))
+    monkeypatch.setattr(server, "job_queue", queue)
+    monkeypatch.setenv("LOB_ADDRESS_CACHE_DB", str(tmp_path / "address_cache.db"))
+    monkeypatch.delitem(integrations._clients, "address_verifier", raising=False)
+    monkeypatch.setattr(pdf_generator, "render_pdf", lambda *args, **kwargs: b"%PDF-1.7\n%%EOF")
+    monkeypatch.delenv("LOB_API_KEY", raising=False)
+
+    accepted, queued, done, missing = asyncio.run(enqueue_and_poll(queue))
+
+    assert accepted.status_code == 202 and queued["state"] == "queued"
+    assert done["state"] == "succeeded" and done["attempts"] == 1
+    assert done["result"]["engine_data"]["birth_card"] and done["result"]["lob"]["status"] == "mocked"
+    assert missing.status_code == 404
+
+def test_download_names_outside_latin1(monkeypatch, tmp_path):
+    monkeypatch.setattr(pdf_generator, "render_pdf", lambda *args, **kwargs: b"%PDF-1.7\n%%EOF")
+    monkeypatch.delenv("LOB_API_KEY", raising=False)
+    monkeypatch.setenv("LETTER_OUTPUT_DIR", str(tmp_path))
+    assert server.letter_output_path("../Ann/李").startswith(str(tmp_path / "manual_ann_"))
+
+    async def download():
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            body = {"first_name": "李", "birth_date": "1991-02-17", "target_month": "2026-03"}
+            return await client.post("/admin/generate-test?download=true", json=body)
+
+    response = asyncio.run(download())
+    assert response.status_code == 200
+    assert response.headers["content-disposition"] == \
+        """inline; filename="manual_subscriber.pdf"; filename*=UTF-8''manual_%E6%9D%8E.pdf"""
@@ -0,0 +1,72 @@
+import threading
+import time
+
+import pytest
+
+from app.integrations import TikTokOrderBatcher
+
+class FakeDetailQuery:
+    """Stands in for fetch_tiktok_orders: records each query's ids."""
+
+    def __init__(self, missing=(), fail=False):
+        self.queries = []
+        self.missing = set(missing)
+        self.fail = fail
+        self.lock = threading.Lock()
+
+    def __call__(self, order_ids):
+        with self.lock:
+            self.queries.append(list(order_ids))
+        if self.fail:
+            raise ConnectionError("TikTok is down")
+        return {oid: {"order_id": oid, "customer": {"first_name": f"Buyer {oid}"}}
+                for oid in order_ids if oid not in self.missing}
+
+def test_burst_is_fetched_in_few_batched_queries_then_served_from_cache():
+    fetch = FakeDetailQuery()
+    batcher = TikTokOrderBatcher(fetch=fetch, window=0.2, max_batch=50)
+    ids = [f"5770{i:04d}" for i in range(120)]
+    results = {}
+
+    def worker(chunk):
+        futures = {oid: batcher.submit(oid) for oid in chunk}
+        results.update({oid: f.result(timeout=5) for oid, f in futures.items()})
+
+    threads = [threading.Thread(target=worker, args=(ids[i::12],)) for i in range(12)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert {oid: order["customer"]["first_name"] for oid, order in results.items()} == {oid: f"Buyer {oid}" for oid in ids}
+    assert sorted(len(q) for q in fetch.queries) == [20, 50, 50]
+    assert sorted(oid for q in fetch.queries for oid in q) == sorted(ids)  # No id fetched twice
+
+    assert batcher.get(ids[0])["order_id"] == ids[0]
+    assert len(fetch.queries) == 3  # Cached: no new query
+
+def test_window_flushes_a_partial_batch_and_ttl_expires():
+    fetch = FakeDetailQuery()
+    batcher = TikTokOrderBatcher(fetch=fetch, window=0.02, ttl=0.1)
+    started = time.perf_counter()
+    assert batcher.get("1", timeout=2)["order_id"] == "1"
+    assert time.perf_counter() - started < 1
+    batcher.get("1")
+    assert len(fetch.queries) == 1
+    time.sleep(0.15)
+    batcher.get("1", timeout=2)
+    assert len(fetch.queries) == 2
+
+def test_missing_orders_and_failed_queries_are_reported_uncached():
+    fetch = FakeDetailQuery(missing={"2"})
+    batcher = TikTokOrderBatcher(fetch=fetch, window=0.01)
+    assert batcher.get("2", timeout=2) is None
+    assert batcher.get("2", timeout=2) is None
+    assert len(fetch.queries) == 2
+
+    fetch = FakeDetailQuery(fail=True)
+    down = TikTokOrderBatcher(fetch=fetch, window=0.01)
+    with pytest.raises(ConnectionError):
+        down.get("3", timeout=2)
+    fetch.fail = False
+    assert down.get("3", timeout=2)["order_id"] == "3"
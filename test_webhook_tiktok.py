@@ -0,0 +1,123 @@
+import asyncio
+import json
+import random
+import statistics
+import time
+
+import httpx
+import pytest
+
+from app import integrations, jobs, pdf_generator, server, webhooks
+
+APP_KEY, APP_SECRET = "test-key", "test-secret"
+
+@pytest.fixture
+def webhook_env(monkeypatch, tmp_path):
+    queue = jobs.JobQueue(str(tmp_path / "jobs.db"))
+    monkeypatch.setattr(server, "job_queue", queue)
+    monkeypatch.setattr(server, "recent_orders", webhooks.RecentIds(max_size=10_000))
+    monkeypatch.setenv("TIKTOK_APP_KEY", APP_KEY)
+    monkeypatch.setenv("TIKTOK_APP_SECRET", APP_SECRET)
+    monkeypatch.setenv("LOB_ADDRESS_CACHE_DB", str(tmp_path / "address_cache.db"))
+    monkeypatch.delitem(integrations._clients, "address_verifier", raising=False)
+    yield queue
+    queue.close()
+
+def signed_event(order_id, secret=APP_SECRET, status="AWAITING_SHIPMENT"):
+    body = json.dumps({"type": 1, "shop_id": "7000", "timestamp": int(time.time()),
+                       "data": {"order_id": order_id, "order_status": status}}).encode()
+    return body, {"Authorization": webhooks.tiktok_signature(APP_KEY, secret, body),
+                  "Content-Type": "application/json"}
+
+async def replay(events, concurrency):
+    """Posts events with `concurrency` in flight; returns (status, json, seconds) per event."""
+    transport = httpx.ASGITransport(app=server.app)
+    limit = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        async def post(body, headers):
+            async with limit:
+                started = time.perf_counter()
+                response = await client.post("/webhook/tiktok", content=body, headers=headers)
+                return response.status_code, response.json(), time.perf_counter() - started
+        return await asyncio.gather(*(post(body, headers) for body, headers in events))
+
+def test_burst_of_redelivered_events_acks_fast_and_queues_each_order_once(webhook_env):
+    unique = [f"5770{i:08d}" for i in range(3000)]
+    orders = unique + random.Random(1).choices(unique, k=1000)  # TikTok redeliveries
+    random.Random(2).shuffle(orders)
+    events = [signed_event(order_id) for order_id in orders]
+
+    started = time.perf_counter()
+    results = asyncio.run(replay(events, concurrency=50))
+    elapsed = time.perf_counter() - started
+
+    statuses = [body["status"] for code, body, _ in results if code == 200]
+    assert len(statuses) == 4000
+    assert statuses.count("accepted") == 3000 and statuses.count("duplicate") == 1000
+    assert webhook_env.counts() == {"queued": 3000}
+
+    latencies = sorted(seconds for _, _, seconds in results)
+    p50, p99 = statistics.median(latencies), latencies[int(len(latencies) * 0.99)]
+    print(f"\n4000 events in {elapsed:.2f}s ({4000 / elapsed:.0f}/s): ack p50 {p50 * 1000:.1f} ms, p99 {p99 * 1000:.1f} ms")
+    assert p99 < 0.1  # Milliseconds in practice; far inside TikTok's webhook timeout
+
+def test_bad_signatures_are_rejected(webhook_env):
+    forged = signed_event("577000000001", secret="wrong-secret")
+    body, headers = signed_event("577000000002")
+    unsigned = (body, {"Content-Type": "application/json"})
+    results = asyncio.run(replay([forged, unsigned], concurrency=2))
+    assert [code for code, _, _ in results] == [401, 401]
+    assert webhook_env.counts() == {}
+
+def test_queued_order_is_fulfilled_by_the_workers(webhook_env, monkeypatch):
+    monkeypatch.setattr(pdf_generator, "render_pdf", lambda *args, **kwargs: b"%PDF-1.7\n%%EOF")
+    monkeypatch.setenv("TIKTOK_MOCK_ORDERS", "1")
+    monkeypatch.delenv("LOB_API_KEY", raising=False)
+    asyncio.run(replay([signed_event("577000000003")], concurrency=1))
+
+    workers = jobs.JobWorkers(webhook_env, server.JOB_HANDLERS)
+    workers.run_job(webhook_env.claim())
+    assert webhook_env.counts() == {"succeeded": 1}
+
+def test_orders_are_never_mailed_without_real_order_data(webhook_env, monkeypatch):
+    mailed = []
+    monkeypatch.setattr(integrations, "send_letter_via_lob", lambda *args, **kwargs: mailed.append(args))
+    monkeypatch.delenv("TIKTOK_ACCESS_TOKEN", raising=False)  # TikTok cannot be asked
+    workers = jobs.JobWorkers(webhook_env, server.JOB_HANDLERS)
+
+    webhook_env.enqueue("tiktok_order", {"order_id": "577000000004", "target_month": "2026-03"})
+    workers.run_job(webhook_env.claim())
+    assert webhook_env.counts() == {"queued": 1}  # Retried later
+
+    order = integrations.mock_tiktok_order("577000000005")
+    order["customer"]["birth_date"] = None
+    monkeypatch.setattr(integrations, "fetch_tiktok_order", lambda order_id: order)
+    job_id = webhook_env.enqueue("tiktok_order", {"order_id": "577000000005", "target_month": "2026-03"})
+    job = webhook_env.claim()  # The first job is backing off
+    assert job["id"] == job_id
+    workers.run_job(job)
+    assert webhook_env.get(job_id)["state"] == "failed"
+    assert mailed == []
+
+def test_only_paid_orders_are_queued_and_mailed(webhook_env, monkeypatch):
+    mailed = []
+    monkeypatch.setattr(pdf_generator, "render_pdf", lambda *args, **kwargs: b"%PDF-1.7\n%%EOF")
+    monkeypatch.setattr(integrations, "send_letter_via_lob",
+                        lambda pdf, addr, idempotency_key=None: mailed.append(idempotency_key) or {"id": "ltr_1"})
+    monkeypatch.setenv("TIKTOK_MOCK_ORDERS", "1")
+    events = [signed_event("577000000006", status="UNPAID"), signed_event("577000000006"),
+              signed_event("577000000007", status="CANCELLED")]
+    results = [asyncio.run(replay([event], concurrency=1))[0][1]["status"] for event in events]
+    assert results == ["ignored", "accepted", "ignored"]
+
+    workers = jobs.JobWorkers(webhook_env, server.JOB_HANDLERS)
+    while (job := webhook_env.claim()) is not None:
+        workers.run_job(job)
+    assert webhook_env.counts() == {"succeeded": 1} and len(mailed) == 1
+
+    # An order cancelled between the event and the job is not mailed either
+    cancelled = {**integrations.mock_tiktok_order("577000000008"), "status": "CANCELLED"}
+    monkeypatch.setattr(integrations, "fetch_tiktok_order", lambda order_id: cancelled)
+    job_id = webhook_env.enqueue("tiktok_order", {"order_id": "577000000008", "target_month": "2026-03"})
+    workers.run_job(webhook_env.claim())
+    assert webhook_env.get(job_id)["state"] == "failed" and len(mailed) == 1
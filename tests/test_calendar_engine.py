@@ -0,0 +1,34 @@
+import datetime
+
+from app import engine
+from generate_calendar import UNANCHORED, generate_daily_calendar
+
+
+def _collision_planet(card, spread_year):
+    position = engine.locate(card, spread_year)
+    if position is None or position[0] == engine.CROWN_ROW:
+        return UNANCHORED
+    return engine.ROWS[position[0]]
+
+
+def test_daily_calendar_matches_engine():
+    # Includes leap-year targets, a Feb 29 birthday and calendars that run into a leap day
+    for birth_year, month, day, target_year in ((1991, 2, 17, 2026), (1980, 12, 30, 2027), (2000, 2, 29, 2028),
+                                                (1955, 7, 4, 2026), (1970, 1, 1, 2024)):
+        start = datetime.date(target_year, month, day)
+        days = list(generate_daily_calendar("X", birth_year, month, day, target_year))
+        assert len(days) == 364
+
+        for offset, entry in enumerate(days):
+            date = start + datetime.timedelta(days=offset)
+            assert entry["date"] == date.isoformat() and entry["day_of_year"] == offset + 1
+
+            data = engine.calculate_letter_data("X", birth_year, month, day, entry["date"])
+            assert entry["period"] == data["period"]["planet"]
+            assert data["period"]["days_since"] == offset + 1
+            chain = engine.full_chain(data["spread_year"], data["birth_card"])
+            assert entry["fractal_card"] == chain[offset % 52]
+
+            global_card = engine.get_birth_card(date.month, date.day)[0]
+            assert entry["global_card"] == global_card
+            assert entry["collision_planet"] == _collision_planet(global_card, data["spread_year"])